@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import atexit
+import contextlib
 import fcntl
-import html
+import functools
 import json
 import os
+import re
 import shlex
 import shutil
 import stat
@@ -13,40 +15,45 @@ import time
 from collections import deque
 from PySide6 import QtCore, QtWidgets, QtGui
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 APP_DISPLAY_NAME = "XMG Backlight Management"
 APP_VERSION = "1.7.0"
 GITHUB_REPO_URL = "https://github.com/Darayavaush-84/xmg_backlight_installer"
 NOTIFICATION_TIMEOUT_MS = 1500
 ACTIVITY_LOG_MAX_LINES = 100
 TOOL_ENV_VAR = "ITE8291R3_CTL"
-TOOL_CANDIDATES = [
+TOOL_CANDIDATES = (
     os.environ.get(TOOL_ENV_VAR),
     "/usr/local/bin/ite8291r3-ctl",
     "ite8291r3-ctl",
-]
+)
 
 
 def _resolve_tool():
+    """Return (path or None, hint listing the candidates) in one pass."""
+    found = None
+    names = []
     for candidate in TOOL_CANDIDATES:
         if not candidate:
             continue
+        names.append(candidate)
+        if found:
+            continue
         path = candidate
         if not os.path.isabs(candidate):
-            resolved = shutil.which(candidate)
-            if not resolved:
+            path = shutil.which(candidate)
+            if not path:
                 continue
-            path = resolved
         if os.path.exists(path) and os.access(path, os.X_OK):
-            return path
-    return None
-
+            found = path
+    return found, ", ".join(names) or "ite8291r3-ctl"
 
-def _tool_hint():
-    candidates = [c for c in TOOL_CANDIDATES if c]
-    return ", ".join(candidates) if candidates else "ite8291r3-ctl"
 
-
-TOOL = _resolve_tool()
+TOOL, _TOOL_HINT = _resolve_tool()
 
 MISSING_TOOL_MESSAGE = (
     f"CLI tool not found. Install 'ite8291r3-ctl' or set ${TOOL_ENV_VAR}."
@@ -60,6 +67,16 @@ EFFECTS = [
 ]
 COLORS = ["white", "red", "orange", "yellow", "green", "blue", "teal", "purple", "random", "custom"]
 DIRECTIONS = ["none", "right", "left", "up", "down"]
+# The lists above keep UI ordering; validation uses these for membership.
+EFFECTS_SET = frozenset(EFFECTS)
+COLORS_SET = frozenset(COLORS)
+DIRECTIONS_SET = frozenset(DIRECTIONS)
+# Brightness (0-50) and speed (0-10) are small bounded ints; reuse their strings.
+_ISTR = tuple(str(i) for i in range(101))
+SILENT_CLI = {"log_cmd": False, "log_stdout": False, "log_stderr": False}
+# Pending work bits for the debounced apply timer.
+DIRTY_BRIGHTNESS = 1
+DIRTY_MODE = 2
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "backlight-linux")
@@ -82,7 +99,22 @@ POWER_MONITOR_SERVICE_PATH = os.path.join(
 )
 POWER_SUPPLY_DIR = "/sys/class/power_supply"
 MAINS_TYPES = {"mains", "ac", "usb"}
-PYTHON_EXECUTABLE = sys.executable or shutil.which("python3") or "/usr/bin/python3"
+
+
+def _python_executable():
+    """Return (interpreter path, error or None); validated once per process."""
+    path = sys.executable or shutil.which("python3") or "/usr/bin/python3"
+    if os.access(path, os.X_OK):
+        return path, None
+    return path, f"Python interpreter '{path}' is not executable; cannot install launchers."
+
+
+PYTHON_EXECUTABLE, PYTHON_EXECUTABLE_ERROR = _python_executable()
+# Shell-quoted forms for the generated Exec= lines.
+_PY_Q = shlex.quote(PYTHON_EXECUTABLE)
+_GUI_Q = shlex.quote(os.path.join(BASE_DIR, "keyboard_backlight.py"))
+_RESTORE_Q = shlex.quote(RESTORE_SCRIPT)
+_POWER_Q = shlex.quote(POWER_MONITOR_SCRIPT)
 DEFAULT_PROFILE_NAME = "Default"
 DEFAULT_PROFILE_STATE = {
     "brightness": 40,
@@ -179,13 +211,28 @@ def normalize_language_code(value):
 
 
 def clamp_int(value, minimum, maximum, fallback):
-    try:
-        ivalue = int(value)
-    except (TypeError, ValueError):
+    if type(value) is int:
+        ivalue = value
+    elif value is None:
         return fallback
+    else:
+        try:
+            ivalue = int(value)
+        except (TypeError, ValueError):
+            return fallback
     return max(minimum, min(maximum, ivalue))
 
 
+@contextlib.contextmanager
+def signals_blocked(*widgets):
+    previous = [widget.blockSignals(True) for widget in widgets]
+    try:
+        yield
+    finally:
+        for widget, was_blocked in zip(widgets, previous):
+            widget.blockSignals(was_blocked)
+
+
 def set_combo_by_data(combo, value):
     idx = combo.findData(value)
     if idx >= 0:
@@ -227,28 +274,61 @@ def release_single_instance_lock(lock_file):
         pass
 
 
+def _atomic_write_bytes(path, data):
+    tmp_path = path + ".tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_if_changed(path, data):
+    try:
+        with open(path, "rb") as handle:
+            if handle.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    _atomic_write_bytes(path, data)
+    return True
+
+
+def _load_json_file(path):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _dump_json_bytes(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
 def read_settings_file():
     try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
+        data = _load_json_file(SETTINGS_PATH)
+        return data if isinstance(data, dict) else {}
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 
 def write_settings_file(data):
     ensure_config_dir()
-    tmp_path = SETTINGS_PATH + ".tmp"
-    try:
-        with open(tmp_path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2)
-        os.replace(tmp_path, SETTINGS_PATH)
-    except OSError:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
-        raise
+    _atomic_write_bytes(SETTINGS_PATH, _dump_json_bytes(data))
 
 
 def sanitize_settings(data):
@@ -275,13 +355,22 @@ def load_translations(language):
         return {}
     path = os.path.join(TRANSLATIONS_DIR, f"{lang}.json")
     try:
-        with open(path, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
+        data = _load_json_file(path)
+        return data if isinstance(data, dict) else {}
     except (FileNotFoundError, json.JSONDecodeError, OSError):
         return {}
 
 
+def load_merged_translations(language):
+    merged = load_translations("en")
+    lang = normalize_language_code(language)
+    if lang and lang != "en":
+        merged.update(
+            (key, text) for key, text in load_translations(lang).items() if text
+        )
+    return merged
+
+
 def detect_system_language():
     try:
         languages = QtCore.QLocale.system().uiLanguages() or []
@@ -301,30 +390,20 @@ def load_settings():
 
 def read_profile_file():
     try:
-        with open(PROFILE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
+        data = _load_json_file(PROFILE_PATH)
+        return data if isinstance(data, dict) else {}
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 
-def write_profile_file(data):
+def write_profile_bytes(blob):
     ensure_config_dir()
-    tmp_path = PROFILE_PATH + ".tmp"
-    try:
-        with open(tmp_path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2)
-        os.replace(tmp_path, PROFILE_PATH)
-    except OSError:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
-        raise
+    _atomic_write_bytes(PROFILE_PATH, blob)
 
 
 def sanitize_choice(value, options, fallback):
-    return value if value in options else fallback
+    # Options are sets of strings; anything unhashable from JSON is invalid anyway.
+    return value if isinstance(value, str) and value in options else fallback
 
 
 def sanitize_profile_state(data):
@@ -332,18 +411,18 @@ def sanitize_profile_state(data):
     if not isinstance(data, dict):
         return base
     base["brightness"] = clamp_int(data.get("brightness"), 0, 50, base["brightness"])
-    base["mode"] = sanitize_choice(data.get("mode"), EFFECTS, base["mode"])
+    base["mode"] = sanitize_choice(data.get("mode"), EFFECTS_SET, base["mode"])
     base["static_color"] = sanitize_choice(
-        data.get("static_color"), COLORS, base["static_color"]
+        data.get("static_color"), COLORS_SET, base["static_color"]
     )
     base["custom_hex"] = data.get("custom_hex", base.get("custom_hex", "#FFFFFF"))
     base["speed"] = clamp_int(data.get("speed"), 0, 10, base["speed"])
     color_value = data.get("color") or "none"
-    if color_value != "none" and color_value not in COLORS:
+    if color_value != "none" and not sanitize_choice(color_value, COLORS_SET, None):
         color_value = "none"
     base["color"] = color_value
     direction_value = sanitize_choice(
-        data.get("direction"), DIRECTIONS, base["direction"]
+        data.get("direction"), DIRECTIONS_SET, base["direction"]
     )
     if data.get("reactive"):
         direction_value = "none"
@@ -372,17 +451,21 @@ def load_profile_store():
     return store
 
 
-def write_profile_store(store):
-    write_profile_file(store)
+def profile_file_signature():
+    try:
+        st = os.stat(PROFILE_PATH)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def ensure_autostart_dir():
     os.makedirs(AUTOSTART_DIR, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
 def autostart_entry_contents():
-    gui_script = os.path.join(BASE_DIR, "keyboard_backlight.py")
-    exec_cmd = f"{shlex.quote(PYTHON_EXECUTABLE)} {shlex.quote(gui_script)}"
+    exec_cmd = f"{_PY_Q} {_GUI_Q}"
     return (
         "[Desktop Entry]\n"
         "Type=Application\n"
@@ -398,11 +481,10 @@ def is_autostart_enabled():
 
 
 def create_autostart_entry():
+    if PYTHON_EXECUTABLE_ERROR:
+        raise OSError(PYTHON_EXECUTABLE_ERROR)
     ensure_autostart_dir()
-    tmp_path = AUTOSTART_ENTRY + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as handle:
-        handle.write(autostart_entry_contents())
-    os.replace(tmp_path, AUTOSTART_ENTRY)
+    _write_if_changed(AUTOSTART_ENTRY, autostart_entry_contents().encode("utf-8"))
 
 
 def remove_autostart_entry():
@@ -429,8 +511,9 @@ def ensure_systemd_user_dir():
     os.makedirs(SYSTEMD_USER_DIR, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
 def resume_service_contents():
-    exec_cmd = f"{shlex.quote(PYTHON_EXECUTABLE)} {shlex.quote(RESTORE_SCRIPT)}"
+    exec_cmd = f"{_PY_Q} {_RESTORE_Q}"
     exec_stop_post = f"/usr/bin/sh -c {shlex.quote('sleep 2; ' + exec_cmd)}"
     return (
         "[Unit]\n"
@@ -453,10 +536,7 @@ def resume_service_contents():
 def ensure_resume_service_file():
     ensure_systemd_user_dir()
     contents = resume_service_contents()
-    tmp_path = RESUME_SERVICE_PATH + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as handle:
-        handle.write(contents)
-    os.replace(tmp_path, RESUME_SERVICE_PATH)
+    _write_if_changed(RESUME_SERVICE_PATH, contents.encode("utf-8"))
 
 
 def remove_resume_service_file():
@@ -466,16 +546,17 @@ def remove_resume_service_file():
         pass
 
 
+# Pure text builder; enable_power_monitor_service() makes the restore script executable.
+@functools.lru_cache(maxsize=1)
 def power_monitor_service_contents():
-    ensure_restore_script_executable()
-    exec_cmd = f"{shlex.quote(PYTHON_EXECUTABLE)} {shlex.quote(POWER_MONITOR_SCRIPT)}"
+    exec_cmd = f"{_PY_Q} {_POWER_Q}"
     return (
         "[Unit]\n"
         "Description=Keyboard backlight power monitor\n"
         "After=graphical-session.target\n"
         "PartOf=graphical-session.target\n\n"
         "[Service]\n"
-        "Type=simple\n"
+        "Type=notify\n"
         f"ExecStart={exec_cmd}\n"
         "Restart=on-failure\n"
         "RestartSec=3\n\n"
@@ -487,10 +568,7 @@ def power_monitor_service_contents():
 def ensure_power_monitor_service_file():
     ensure_systemd_user_dir()
     contents = power_monitor_service_contents()
-    tmp_path = POWER_MONITOR_SERVICE_PATH + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as handle:
-        handle.write(contents)
-    os.replace(tmp_path, POWER_MONITOR_SERVICE_PATH)
+    _write_if_changed(POWER_MONITOR_SERVICE_PATH, contents.encode("utf-8"))
 
 
 def remove_power_monitor_service_file():
@@ -500,8 +578,14 @@ def remove_power_monitor_service_file():
         pass
 
 
+# Resolved once; without systemd every service helper short-circuits to rc 127.
+_SYSTEMCTL = shutil.which("systemctl")
+
+
 def systemctl_user(args):
-    cmd = ["systemctl", "--user", *args]
+    if _SYSTEMCTL is None:
+        return 127, "", "systemctl not found"
+    cmd = [_SYSTEMCTL, "--user", *args]
     try:
         proc = subprocess.run(cmd, text=True, capture_output=True)
         return proc.returncode, (proc.stdout or "").strip(), (proc.stderr or "").strip()
@@ -509,7 +593,46 @@ def systemctl_user(args):
         return 127, "", "systemctl not found"
 
 
-def is_power_monitor_enabled():
+UNIT_STATES_TTL = 2.0
+UNIT_ENABLED_STATES = frozenset(
+    ("enabled", "enabled-runtime", "static", "alias", "indirect", "generated", "transient")
+)
+
+
+def scan_systemd_user_dir():
+    """Return {name: is_file} for SYSTEMD_USER_DIR from one directory listing."""
+    try:
+        with os.scandir(SYSTEMD_USER_DIR) as entries:
+            return {entry.name: entry.is_file() for entry in entries}
+    except OSError:
+        return {}
+
+
+def load_unit_states():
+    """Return {unit: state} for all user unit files, or None if listing failed."""
+    rc, out, _ = systemctl_user(["list-unit-files", "--no-legend", "--no-pager"])
+    if rc != 0:
+        return None
+    states = {}
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            states[fields[0]] = fields[1]
+    return states
+
+
+def unit_status_from_states(name, unit_states):
+    state = unit_states.get(name)
+    if state is None:
+        return False, "Disabled"
+    if state in UNIT_ENABLED_STATES:
+        return True, "Enabled"
+    return False, state
+
+
+def is_power_monitor_enabled(unit_states=None):
+    if unit_states is not None:
+        return unit_status_from_states(POWER_MONITOR_SERVICE_NAME, unit_states)
     rc, out, err = systemctl_user(["is-enabled", POWER_MONITOR_SERVICE_NAME])
     if rc == 0:
         return True, "Enabled"
@@ -526,6 +649,8 @@ def is_power_monitor_enabled():
 
 
 def enable_power_monitor_service():
+    if PYTHON_EXECUTABLE_ERROR:
+        return False, PYTHON_EXECUTABLE_ERROR
     ensure_restore_script_executable()
     ensure_power_monitor_service_file()
     rc, _, err = systemctl_user(["daemon-reload"])
@@ -546,7 +671,9 @@ def disable_power_monitor_service():
     return True, "Power monitor disabled."
 
 
-def is_resume_service_enabled():
+def is_resume_service_enabled(unit_states=None):
+    if unit_states is not None:
+        return unit_status_from_states(RESUME_SERVICE_NAME, unit_states)
     rc, out, err = systemctl_user(["is-enabled", RESUME_SERVICE_NAME])
     if rc == 0:
         return True, "Enabled"
@@ -563,6 +690,8 @@ def is_resume_service_enabled():
 
 
 def enable_resume_service():
+    if PYTHON_EXECUTABLE_ERROR:
+        return False, PYTHON_EXECUTABLE_ERROR
     ensure_restore_script_executable()
     ensure_resume_service_file()
     rc, _, err = systemctl_user(["daemon-reload"])
@@ -583,6 +712,26 @@ def disable_resume_service():
     return True, "Resume service disabled."
 
 
+# Per systemd toggle: attribute prefix on Main -> (unit, status check, enable,
+# disable, tooltip key when systemctl is missing).
+SERVICE_CONTROLS = {
+    "resume": (
+        RESUME_SERVICE_NAME,
+        is_resume_service_enabled,
+        enable_resume_service,
+        disable_resume_service,
+        "status.systemctl_unavailable",
+    ),
+    "power_monitor": (
+        POWER_MONITOR_SERVICE_NAME,
+        is_power_monitor_enabled,
+        enable_power_monitor_service,
+        disable_power_monitor_service,
+        "status.systemctl_unavailable_monitor",
+    ),
+}
+
+
 LOG_COLORS = {
     "info": "#e5e7eb",
     "cmd": "#7dd3fc",
@@ -592,19 +741,21 @@ LOG_COLORS = {
 }
 
 
+LOG_SPAN_OPEN = {level: f'<span style="color:{color}">' for level, color in LOG_COLORS.items()}
+_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
 def format_log(text, level="info"):
-    color = LOG_COLORS.get(level, LOG_COLORS["info"])
-    safe = html.escape(text)
-    return f'<span style="color:{color}">{safe}</span>'
+    opener = LOG_SPAN_OPEN.get(level) or LOG_SPAN_OPEN["info"]
+    return opener + text.translate(_ESCAPE_TABLE) + "</span>"
 
 
 def run_cmd(args, log_cb=None, *, log_cmd=True, log_stdout=True, log_stderr=True):
-    cmd_display = " ".join(shlex.quote(str(a)) for a in args)
     if log_cb and log_cmd:
-        log_cb(f"$ {cmd_display}", level="cmd")
+        log_cb("$ " + " ".join(map(shlex.quote, args)), level="cmd")
 
     if not TOOL:
-        msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_tool_hint()})"
+        msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_TOOL_HINT})"
         if log_cb:
             log_cb(msg, level="error")
         return 127, "", msg
@@ -619,7 +770,7 @@ def run_cmd(args, log_cb=None, *, log_cmd=True, log_stdout=True, log_stderr=True
             log_cb(stderr, level="stderr")
         return p.returncode, stdout, stderr
     except FileNotFoundError:
-        msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_tool_hint()})"
+        msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_TOOL_HINT})"
         if log_cb:
             log_cb(msg, level="error")
         return 127, "", msg
@@ -630,7 +781,7 @@ def format_cli_error(rc, out, err):
     lower = text.lower()
 
     if rc == 127 or "cli tool non trovato" in lower or "cli tool not found" in lower:
-        return f"{MISSING_TOOL_MESSAGE} Searched: {_tool_hint()}."
+        return f"{MISSING_TOOL_MESSAGE} Searched: {_TOOL_HINT}."
 
     if "libusb_error_access" in lower or "permission denied" in lower:
         return (
@@ -647,57 +798,588 @@ def format_cli_error(rc, out, err):
     return f"Error ({rc}): unknown"
 
 
-def drop_flag(args, flag):
+QUERY_LINE_RE = re.compile(
+    r"^[ \t\r]*(?:(\d+)|(on|off))[ \t\r]*$", re.MULTILINE | re.IGNORECASE
+)
+
+
+def parse_query_state(out):
+    # `query --brightness --state` prints one value per line; the last of each wins.
+    brightness = None
+    state = None
+    for number, word in QUERY_LINE_RE.findall(out or ""):
+        if number:
+            brightness = int(number)
+        else:
+            state = word.lower()
+    return brightness, state
+
+
+VALUE_FLAGS = frozenset(("-s", "-b", "-c", "-d"))
+
+
+def drop_flags(args, flags):
     out = []
-    i = 0
-    while i < len(args):
-        if args[i] == flag:
-            if flag in ("-s", "-b", "-c", "-d") and i + 1 < len(args):
-                i += 2
-                continue
-            i += 1
+    it = iter(args)
+    for a in it:
+        if a in flags:
+            if a in VALUE_FLAGS:
+                next(it, None)
             continue
-        out.append(args[i])
-        i += 1
+        out.append(a)
     return out
 
 
+def drop_flag(args, flag):
+    return drop_flags(args, (flag,))
+
+
+EFFECT_FALLBACK_FLAGS = (
+    ("direction", "-d"),
+    ("reactive", "-r"),
+    ("color", "-c"),
+    ("speed", "-s"),
+    ("brightness", "-b"),
+)
+
+
+def next_fallback_args(args, out, err, tried):
+    msg = (err or out or "").lower()
+    for key, flag in EFFECT_FALLBACK_FLAGS:
+        if key in msg and flag not in tried:
+            tried.add(flag)
+            return drop_flag(args, flag)
+    return None
+
+
+FALLBACK_FLAG_BY_KEY = dict(EFFECT_FALLBACK_FLAGS)
+NOT_NEEDED_RE = re.compile(r"(direction|reactive|color|speed|brightness)'? attr is not needed")
+# The CLI rejects one attribute per run; remember what each effect refused so
+# later applies drop all of it up front instead of retrying flag by flag.
+_rejected_effect_flags = {}
+
+
+def drop_known_rejected(args):
+    flags = _rejected_effect_flags.get(args[-1])
+    return drop_flags(args, flags) if flags else args
+
+
+def fused_fallback_args(args, out, err, tried):
+    named = {FALLBACK_FLAG_BY_KEY[k] for k in NOT_NEEDED_RE.findall((err or out or "").lower())}
+    known = _rejected_effect_flags.setdefault(args[-1], set())
+    known |= named
+    flags = (named | known) - tried
+    if not flags:
+        return None
+    tried |= flags
+    return drop_flags(args, flags)
+
+
+def fallback_args(args, out, err, tried):
+    return fused_fallback_args(args, out, err, tried) or next_fallback_args(args, out, err, tried)
+
+
+def effect_args_detail(args, rc):
+    return " ".join(args[1:]) if rc == 0 else ""
+
+
 def apply_effect_with_fallback(args, runner=run_cmd):
+    args = drop_known_rejected(args)
     rc, out, err = runner(args)
     if rc == 0:
-        return rc, out, err, args
+        return rc, out, err, args, effect_args_detail(args, rc)
 
     msg = (err or out or "").lower()
     if "attr is not needed by effect" not in msg:
-        return rc, out, err, args
-
-    candidates = [
-        ("direction", "-d"),
-        ("reactive", "-r"),
-        ("color", "-c"),
-        ("speed", "-s"),
-        ("brightness", "-b"),
-    ]
+        return rc, out, err, args, ""
 
     tried = set()
     current = list(args)
 
     for _ in range(6):
-        m = (err or out or "").lower()
-        changed = False
-        for key, flag in candidates:
-            if key in m and flag not in tried:
-                tried.add(flag)
-                current = drop_flag(current, flag)
-                rc, out, err = runner(current)
-                changed = True
-                if rc == 0:
-                    return rc, out, err, current
-                break
-        if not changed:
+        candidate = fallback_args(current, out, err, tried)
+        if candidate is None:
+            break
+        current = candidate
+        rc, out, err = runner(current)
+        if rc == 0:
             break
 
-    return rc, out, err, current
+    return rc, out, err, current, effect_args_detail(current, rc)
+
+
+_BASE_QSS = """
+#MainView {
+    background-color: #f6f8fb;
+}
+#logWindow {
+    background-color: #eef2f7;
+    background-image: radial-gradient(circle at 15% 15%, rgba(59, 130, 246, 0.12), transparent 55%);
+}
+#AppSurface {
+    background-color: transparent;
+}
+QLabel, QCheckBox, QToolButton {
+    color: #1f2933;
+    font-size: 13px;
+}
+#heroTitle {
+    font-size: 28px;
+    font-weight: 700;
+    color: #0f172a;
+}
+#heroSubtitle {
+    font-size: 14px;
+    color: #52606d;
+}
+#heroCard {
+    background-color: #ffffff;
+    border-radius: 20px;
+    border: 1px solid rgba(15, 33, 55, 0.08);
+    background-image: radial-gradient(circle at 15% 20%, rgba(79, 209, 197, 0.25), transparent 60%),
+                      radial-gradient(circle at 85% 10%, rgba(99, 102, 241, 0.2), transparent 45%);
+}
+#heroCaption {
+    font-size: 11px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    color: #738095;
+}
+#hardwareBadge {
+    padding: 6px 12px;
+    border-radius: 999px;
+    background: rgba(59, 130, 246, 0.12);
+    color: #1d4ed8;
+    font-weight: 600;
+}
+#pillButton {
+    padding: 9px 18px;
+    border-radius: 999px;
+    font-weight: 600;
+    border: 1px solid rgba(148,163,184,0.45);
+    color: #0f172a;
+    background-color: #ffffff;
+}
+#pillButton:checked {
+    background-color: #3b82f6;
+    border: none;
+    color: #ffffff;
+}
+#surfaceCard {
+    background-color: #ffffff;
+    border-radius: 20px;
+    border: 1px solid rgba(15, 23, 42, 0.05);
+}
+#sectionTitle {
+    font-size: 17px;
+    font-weight: 600;
+    color: #111827;
+}
+#sectionSubtitle {
+    font-size: 13px;
+    color: #5f6b7a;
+}
+QComboBox, QSpinBox, QTextEdit {
+    padding: 8px 12px;
+    border-radius: 12px;
+    border: 1px solid rgba(148, 163, 184, 0.4);
+    background-color: #f9fafc;
+    color: #1f2933;
+}
+QComboBox::drop-down {
+    border: none;
+}
+QSlider::groove:horizontal {
+    height: 6px;
+    border-radius: 3px;
+    background: rgba(148, 163, 184, 0.35);
+}
+QSlider::handle:horizontal {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                stop:0 #34d399, stop:1 #60a5fa);
+    border: 2px solid #22c55e;
+    border-radius: 10px;
+    width: 20px;
+    margin: -7px 0;
+}
+QSlider::sub-page:horizontal {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                stop:0 #38bdf8, stop:1 #a855f7);
+    border-radius: 3px;
+}
+QPushButton {
+    padding: 11px 18px;
+    border-radius: 12px;
+    font-weight: 600;
+    border: 1px solid rgba(37, 99, 235, 0.15);
+    background: #ffffff;
+    color: #1f2933;
+}
+QPushButton:hover {
+    border-color: rgba(37, 99, 235, 0.4);
+}
+QPushButton:pressed {
+    background: #e2e8f0;
+}
+QPushButton:disabled {
+    border: 1px solid rgba(148, 163, 184, 0.3);
+    background: #f1f5f9;
+    color: rgba(57, 77, 96, 0.6);
+}
+QPushButton:focus {
+    outline: 0;
+    border-color: rgba(99, 102, 241, 0.8);
+}
+#powerButton {
+    font-size: 16px;
+    text-transform: uppercase;
+    letter-spacing: 0.02em;
+    border: none;
+    color: #ffffff;
+}
+#powerButton[powerState="off"] {
+    background-color: #16a34a;
+}
+#powerButton[powerState="on"] {
+    background-color: #dc2626;
+}
+QTextEdit {
+    min-height: 160px;
+}
+#logView {
+    background-color: #0b1120;
+    color: #e2e8f0;
+    border: 1px solid rgba(15, 23, 42, 0.6);
+}
+#helperRow {
+    background-color: #f9fafc;
+    border-radius: 14px;
+    border: 1px solid rgba(148, 163, 184, 0.35);
+}
+#helperInfoButton {
+    border-radius: 999px;
+    background: rgba(148, 163, 184, 0.3);
+    color: #0f172a;
+    font-weight: 700;
+}
+#helperLabel {
+    font-weight: 600;
+    color: #1f2933;
+}
+#helperFlag {
+    font-weight: 600;
+}
+#helperDetail {
+    color: #4b5563;
+    font-size: 12px;
+}
+QCheckBox::indicator {
+    width: 20px;
+    height: 20px;
+}
+QCheckBox::indicator:unchecked {
+    border-radius: 6px;
+    border: 1px solid rgba(148, 163, 184, 0.7);
+    background-color: #ffffff;
+}
+QCheckBox::indicator:checked {
+    border-radius: 6px;
+    border: none;
+    background-color: #3b82f6;
+}
+QPushButton#helperFlag {
+    padding: 8px 22px;
+    border-radius: 16px;
+    border: 2px solid #94a3b8;
+    background-color: #ffffff;
+    font-weight: 600;
+    color: #1f2933;
+}
+QPushButton#helperFlag:checked {
+    border: 2px solid #16a34a;
+    color: #ffffff;
+    background-color: #16a34a;
+}
+QPushButton#helperFlag:disabled {
+    background-color: #f1f5f9;
+    color: #94a3b8;
+    border: 2px solid #cbd5e1;
+}
+QPushButton#applyButton {
+    padding: 8px 22px;
+    border-radius: 16px;
+    border: 2px solid #94a3b8;
+    background-color: #ffffff;
+    font-weight: 600;
+    color: #1f2933;
+}
+QPushButton#applyButton:enabled {
+    border: 2px solid #16a34a;
+    color: #ffffff;
+    background-color: #16a34a;
+}
+QPushButton#applyButton:disabled {
+    background-color: #f1f5f9;
+    color: #94a3b8;
+    border: 2px solid #cbd5e1;
+}
+"""
+
+_DARK_QSS = """
+#MainView {
+    background-color: #0f172a;
+}
+#logWindow {
+    background-color: #0b1220;
+    background-image: radial-gradient(circle at 15% 15%, rgba(59, 130, 246, 0.18), transparent 55%);
+}
+#AppSurface {
+    background-color: transparent;
+}
+QLabel, QCheckBox, QToolButton {
+    color: #e2e8f0;
+    font-size: 13px;
+}
+#heroTitle {
+    font-size: 28px;
+    font-weight: 700;
+    color: #f1f5f9;
+}
+#heroSubtitle {
+    font-size: 14px;
+    color: #94a3b8;
+}
+#heroCard {
+    background-color: #1e293b;
+    border-radius: 20px;
+    border: 1px solid rgba(148, 163, 184, 0.15);
+    background-image: radial-gradient(circle at 15% 20%, rgba(79, 209, 197, 0.15), transparent 60%),
+                      radial-gradient(circle at 85% 10%, rgba(99, 102, 241, 0.12), transparent 45%);
+}
+#heroCaption {
+    font-size: 11px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    color: #64748b;
+}
+#hardwareBadge {
+    padding: 6px 12px;
+    border-radius: 999px;
+    background: rgba(59, 130, 246, 0.2);
+    color: #60a5fa;
+    font-weight: 600;
+}
+#pillButton {
+    padding: 9px 18px;
+    border-radius: 999px;
+    font-weight: 600;
+    border: 1px solid rgba(148,163,184,0.3);
+    color: #e2e8f0;
+    background-color: #1e293b;
+}
+#pillButton:checked {
+    background-color: #3b82f6;
+    border: none;
+    color: #ffffff;
+}
+#surfaceCard {
+    background-color: #1e293b;
+    border-radius: 20px;
+    border: 1px solid rgba(148, 163, 184, 0.1);
+}
+#sectionTitle {
+    font-size: 17px;
+    font-weight: 700;
+    color: #f1f5f9;
+}
+#sectionSubtitle {
+    font-size: 13px;
+    color: #94a3b8;
+}
+QComboBox {
+    padding: 10px 14px;
+    border-radius: 10px;
+    border: 1px solid rgba(148, 163, 184, 0.3);
+    background-color: #0f172a;
+    color: #e2e8f0;
+    font-size: 13px;
+}
+QComboBox:hover {
+    border-color: rgba(99, 102, 241, 0.5);
+}
+QComboBox::drop-down {
+    border: none;
+}
+QSlider::groove:horizontal {
+    height: 6px;
+    border-radius: 3px;
+    background: rgba(148, 163, 184, 0.25);
+}
+QSlider::handle:horizontal {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                stop:0 #34d399, stop:1 #60a5fa);
+    border: 2px solid #22c55e;
+    border-radius: 10px;
+    width: 20px;
+    margin: -7px 0;
+}
+QSlider::sub-page:horizontal {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                stop:0 #38bdf8, stop:1 #a855f7);
+    border-radius: 3px;
+}
+QSpinBox {
+    padding: 10px 14px;
+    border-radius: 10px;
+    border: 1px solid rgba(148, 163, 184, 0.3);
+    background-color: #0f172a;
+    color: #e2e8f0;
+    font-size: 13px;
+}
+QPushButton {
+    padding: 11px 18px;
+    border-radius: 12px;
+    font-weight: 600;
+    border: 1px solid rgba(148, 163, 184, 0.3);
+    background: #1e293b;
+    color: #e2e8f0;
+}
+QPushButton:hover {
+    border-color: rgba(99, 102, 241, 0.5);
+}
+QPushButton:pressed {
+    background: #334155;
+    color: #e2e8f0;
+}
+QPushButton:disabled {
+    border: 1px solid rgba(148, 163, 184, 0.2);
+    background: #1e293b;
+    color: rgba(148, 163, 184, 0.5);
+}
+QPushButton:focus {
+    outline: 0;
+    border-color: rgba(99, 102, 241, 0.8);
+}
+#powerButton {
+    font-size: 16px;
+    text-transform: uppercase;
+    letter-spacing: 0.02em;
+    border: none;
+    color: #ffffff;
+}
+#powerButton[powerState="off"] {
+    background-color: #16a34a;
+}
+#powerButton[powerState="on"] {
+    background-color: #dc2626;
+}
+QTextEdit {
+    min-height: 160px;
+}
+#logView {
+    background-color: #020617;
+    color: #e2e8f0;
+    border: 1px solid rgba(148, 163, 184, 0.2);
+}
+#helperRow {
+    background-color: #0f172a;
+    border-radius: 14px;
+    border: 1px solid rgba(148, 163, 184, 0.2);
+}
+#helperInfoButton {
+    border-radius: 999px;
+    background: rgba(148, 163, 184, 0.2);
+    color: #e2e8f0;
+    font-weight: 700;
+}
+#helperLabel {
+    font-weight: 600;
+    color: #e2e8f0;
+}
+#helperFlag {
+    font-weight: 600;
+}
+#helperDetail {
+    color: #94a3b8;
+    font-size: 12px;
+}
+QCheckBox::indicator {
+    width: 20px;
+    height: 20px;
+}
+QCheckBox::indicator:unchecked {
+    border-radius: 6px;
+    border: 1px solid rgba(148, 163, 184, 0.5);
+    background-color: #1e293b;
+}
+QCheckBox::indicator:checked {
+    border-radius: 6px;
+    border: none;
+    background-color: #3b82f6;
+}
+QPushButton#helperFlag {
+    padding: 8px 22px;
+    border-radius: 16px;
+    border: 2px solid #64748b;
+    background-color: #1e293b;
+    font-weight: 600;
+    color: #e2e8f0;
+}
+QPushButton#helperFlag:checked {
+    border: 2px solid #16a34a;
+    color: #ffffff;
+    background-color: #16a34a;
+}
+QPushButton#helperFlag:disabled {
+    background-color: #1e293b;
+    color: #64748b;
+    border: 2px solid #334155;
+}
+QPushButton#applyButton {
+    padding: 8px 22px;
+    border-radius: 16px;
+    border: 2px solid #64748b;
+    background-color: #1e293b;
+    font-weight: 600;
+    color: #e2e8f0;
+}
+QPushButton#applyButton:enabled {
+    border: 2px solid #16a34a;
+    color: #ffffff;
+    background-color: #16a34a;
+}
+QPushButton#applyButton:disabled {
+    background-color: #1e293b;
+    color: #64748b;
+    border: 2px solid #334155;
+}
+QMessageBox {
+    background-color: #1e293b;
+    color: #e2e8f0;
+}
+QMessageBox QLabel {
+    color: #e2e8f0;
+}
+QMessageBox QPushButton {
+    min-width: 80px;
+    padding: 8px 16px;
+}
+QInputDialog {
+    background-color: #1e293b;
+    color: #e2e8f0;
+}
+QInputDialog QLabel {
+    color: #e2e8f0;
+}
+QInputDialog QLineEdit {
+    padding: 10px 14px;
+    border-radius: 10px;
+    border: 1px solid rgba(148, 163, 184, 0.3);
+    background-color: #0f172a;
+    color: #e2e8f0;
+    font-size: 13px;
+}
+"""
 
 
 class Main(QtWidgets.QWidget):
@@ -706,6 +1388,8 @@ class Main(QtWidgets.QWidget):
         self.setWindowTitle(f"{APP_DISPLAY_NAME} v{APP_VERSION}")
         self.resize(980, 500)
         self.activity_log_buffer = deque(maxlen=ACTIVITY_LOG_MAX_LINES)
+        # Rendered console entries; only pushed into the QTextEdit while it is shown.
+        self._log_entries = deque(maxlen=ACTIVITY_LOG_MAX_LINES)
 
         QtWidgets.QApplication.setStyle("Fusion")
         QtWidgets.QApplication.setQuitOnLastWindowClosed(False)
@@ -720,31 +1404,41 @@ class Main(QtWidgets.QWidget):
             self.language = detect_system_language()
         if self.language not in LANGUAGE_LABELS:
             self.language = "en"
-        self.translations = load_translations(self.language)
-        self.fallback_translations = load_translations("en")
+        self.translations = load_merged_translations(self.language)
+        self._unknown_error = self.tr("status.unknown_error")
         self.tray_supported = QtWidgets.QSystemTrayIcon.isSystemTrayAvailable()
         self.is_off = False
         self.last_brightness = 40
         self.last_static_color = "white"
         self._suppress = False
-        self._pending_effect_after_brightness = False
-        self._ignore_profile_events = False
+        self._dirty = 0
+        self._local_seq = 0
+        self._last_applied_brightness = None
+        self._power_btn_state = None
+        self._last_written_blob = None
         self._updating_profile_combo = False
         self._profile_dirty = False
+        self._captured_state = None
         ensure_restore_script_executable()
+        self._profile_file_sig = profile_file_signature()
         self.profile_store = load_profile_store()
+        self.remember_loaded_profile_store()
         self.active_profile_name = self.profile_store["active"]
-        self.profile_data = dict(self.profile_store["profiles"][self.active_profile_name])
-        self.autostart_enabled = is_autostart_enabled()
+        # profile_data is the store's own entry for the active profile, not a
+        # copy; only update_active_profile_state edits it in place.
+        self.profile_data = self.profile_store["profiles"][self.active_profile_name]
+        self._autostart_cached = is_autostart_enabled()
+        self.autostart_enabled = self._autostart_cached
         if self.autostart_enabled and not self.settings.get("start_in_tray", False):
             self.settings["start_in_tray"] = True
             self.save_settings()
-        self.resume_enabled = False
-        self.resume_status = "Unknown"
-        status_enabled, status_text = is_resume_service_enabled()
-        self.resume_enabled = status_enabled
-        self.resume_status = status_text
-        self.power_monitor_enabled, self.power_monitor_status = is_power_monitor_enabled()
+        self._unit_states = None
+        self._unit_states_ts = 0.0
+        self._unit_files = None
+        for prefix, (unit, check, *_rest) in SERVICE_CONTROLS.items():
+            status_enabled, status_text = self.service_status(unit, check)
+            setattr(self, f"{prefix}_enabled", status_enabled)
+            setattr(self, f"{prefix}_status", status_text)
         self.profile_watcher = QtCore.QFileSystemWatcher(self)
         self.profile_watcher.fileChanged.connect(self.on_profile_file_changed)
         self.profile_watcher.directoryChanged.connect(self.on_profile_directory_changed)
@@ -754,7 +1448,7 @@ class Main(QtWidgets.QWidget):
                 self.profile_data.get("brightness"), 0, 50, self.last_brightness
             )
             self.last_static_color = sanitize_choice(
-                self.profile_data.get("static_color"), COLORS, self.last_static_color
+                self.profile_data.get("static_color"), COLORS_SET, self.last_static_color
             )
 
         self.setObjectName("MainView")
@@ -1202,13 +1896,24 @@ class Main(QtWidgets.QWidget):
 
         self.apply_timer = QtCore.QTimer(self)
         self.apply_timer.setSingleShot(True)
-        self.apply_timer.setInterval(180)
-        self.apply_timer.timeout.connect(self.apply_current_mode)
-
-        self.brightness_timer = QtCore.QTimer(self)
-        self.brightness_timer.setSingleShot(True)
-        self.brightness_timer.setInterval(240)
-        self.brightness_timer.timeout.connect(self.apply_brightness_only)
+        self.apply_timer.setInterval(200)
+        self.apply_timer.timeout.connect(self.on_apply_timeout)
+
+        self._pending_cmd = None
+        self.cli_timer = QtCore.QTimer(self)
+        self.cli_timer.setSingleShot(True)
+        self.cli_timer.setInterval(80)
+        self.cli_timer.timeout.connect(self.run_pending_cmd)
+
+        self._cli_seq = 0
+        self._cli_busy = False
+        self._flushing = False
+        self._static_step = None
+        self._cli_callback = None
+        self._cli_log_flags = (True, True)
+        self._cli_proc = QtCore.QProcess(self)
+        self._cli_proc.finished.connect(self._on_cli_done)
+        self._cli_proc.errorOccurred.connect(self._on_cli_error)
 
         self.detect_device()
         self.apply_styles()
@@ -1218,6 +1923,20 @@ class Main(QtWidgets.QWidget):
         self.update_panels()
         self.update_power_button()
 
+        self.sync_control_shadows()
+        self.b_spin.valueChanged.connect(lambda value: setattr(self, "_b", int(value)))
+        self.speed.valueChanged.connect(lambda value: setattr(self, "_speed", value))
+        self.mode.currentIndexChanged.connect(self.sync_mode_shadow)
+        self.color.currentIndexChanged.connect(
+            lambda _index: setattr(self, "_color", self.color.currentData() or "none")
+        )
+        self.direction.currentIndexChanged.connect(
+            lambda _index: setattr(
+                self, "_direction", self.direction.currentData() or "none"
+            )
+        )
+        self.reactive.toggled.connect(lambda checked: setattr(self, "_reactive", checked))
+
         self.b_slider.valueChanged.connect(self.b_spin.setValue)
         self.b_spin.valueChanged.connect(self.b_slider.setValue)
 
@@ -1260,6 +1979,11 @@ class Main(QtWidgets.QWidget):
 
         self.tray_icon = None
         self._tray_close_hint_shown = False
+        # Profile dialogs are built on first use and then reused.
+        self._name_dialog = None
+        self._warning_box = None
+        self._question_box = None
+        self._question_on_yes = None
         self._quitting = False
         self._last_sync_ts = 0.0
         self.setup_tray_icon(enable_tray=enable_tray)
@@ -1277,16 +2001,20 @@ class Main(QtWidgets.QWidget):
     def log(self, text, level="info"):
         timestamp = time.strftime("%H:%M:%S")
         self._append_activity_log_lines(text, level, timestamp)
-        entry = format_log(f"[{timestamp}] {text}", level)
-        self.console.append(entry)
+        # Keep the raw entry; HTML is only built when the console is showing.
+        self._log_entries.append((timestamp, text, level))
+        if hasattr(self, "log_window") and self.log_window.isVisible():
+            self.console.append(format_log(f"[{timestamp}] {text}", level))
+            self._scroll_log_to_end()
+            self._fit_log_window()
+
+    def _scroll_log_to_end(self):
         sb = self.console.verticalScrollBar()
         if sb:
             sb.setValue(sb.maximum())
-        if hasattr(self, "log_window") and self.log_window.isVisible():
-            self._fit_log_window()
 
     def tr(self, key, **kwargs):
-        text = self.translations.get(key) or self.fallback_translations.get(key) or key
+        text = self.translations.get(key) or key
         if kwargs:
             try:
                 return text.format(**kwargs)
@@ -1304,16 +2032,13 @@ class Main(QtWidgets.QWidget):
                 self.save_settings()
             return
         self.language = lang
-        self.translations = load_translations(lang)
-        self.fallback_translations = load_translations("en")
+        self.translations = load_merged_translations(lang)
+        self._unknown_error = self.tr("status.unknown_error")
         if hasattr(self, "language_combo"):
-            blocker = QtCore.QSignalBlocker(self.language_combo)
-            try:
+            with signals_blocked(self.language_combo):
                 idx = self.language_combo.findData(lang)
                 if idx >= 0:
                     self.language_combo.setCurrentIndex(idx)
-            finally:
-                del blocker
         if save:
             self.settings["language"] = lang
             self.save_settings()
@@ -1325,11 +2050,7 @@ class Main(QtWidgets.QWidget):
         color_value = self.color.currentData() or "none"
         direction_value = self.direction.currentData() or "none"
 
-        mode_blocker = QtCore.QSignalBlocker(self.mode)
-        static_blocker = QtCore.QSignalBlocker(self.static_color)
-        color_blocker = QtCore.QSignalBlocker(self.color)
-        direction_blocker = QtCore.QSignalBlocker(self.direction)
-        try:
+        with signals_blocked(self.mode, self.static_color, self.color, self.direction):
             self.mode.clear()
             for effect in EFFECTS:
                 self.mode.addItem(self.tr(f"effect.{effect}"), effect)
@@ -1350,11 +2071,21 @@ class Main(QtWidgets.QWidget):
             for direction in DIRECTIONS:
                 self.direction.addItem(self.tr(f"direction.{direction}"), direction)
             set_combo_by_data(self.direction, direction_value)
-        finally:
-            del mode_blocker
-            del static_blocker
-            del color_blocker
-            del direction_blocker
+        self.sync_control_shadows()
+
+    def sync_control_shadows(self):
+        # Controls were set programmatically; the last captured state is stale.
+        self._captured_state = None
+        self._b = int(self.b_spin.value())
+        self.sync_mode_shadow()
+        self._speed = self.speed.value()
+        self._color = self.color.currentData() or "none"
+        self._direction = self.direction.currentData() or "none"
+        self._reactive = self.reactive.isChecked()
+
+    def sync_mode_shadow(self, _index=None):
+        self._mode = self.mode.currentData() or "static"
+        self._apply_fn = self.apply_static if self._mode == "static" else self.apply_effect
 
     def apply_language(self):
         self.hero_subtitle.setText(self.tr("hero.subtitle"))
@@ -1484,22 +2215,11 @@ class Main(QtWidgets.QWidget):
             return
         if self.tray_icon is None:
             self.tray_icon = QtWidgets.QSystemTrayIcon(self.windowIcon(), self)
-            menu = QtWidgets.QMenu(self)
-            menu.aboutToShow.connect(self.on_tray_menu_about_to_show)
-            self.tray_show_action = menu.addAction(self.tr("tray.show_window"))
-            self.tray_show_action.triggered.connect(self.show_window_from_tray)
-            menu.addSeparator()
-            self.tray_turn_on_action = menu.addAction(self.tr("tray.turn_on"))
-            self.tray_turn_on_action.triggered.connect(self.on_tray_turn_on)
-            self.tray_turn_off_action = menu.addAction(self.tr("tray.turn_off"))
-            self.tray_turn_off_action.triggered.connect(self.on_tray_turn_off)
-            menu.addSeparator()
-            self.tray_profiles_menu = menu.addMenu(self.tr("tray.profiles"))
-            self.rebuild_tray_profiles_menu()
-            menu.addSeparator()
-            self.tray_quit_action = menu.addAction(self.tr("tray.quit"))
-            self.tray_quit_action.triggered.connect(self.on_tray_quit)
-            self.tray_icon.setContextMenu(menu)
+            # StatusNotifier hosts need a menu attached up front; its actions
+            # are only created the first time it is about to show.
+            self.tray_menu = QtWidgets.QMenu(self)
+            self.tray_menu.aboutToShow.connect(self.on_tray_menu_about_to_show)
+            self.tray_icon.setContextMenu(self.tray_menu)
             self.tray_icon.activated.connect(self.on_tray_activated)
         if self.tray_icon:
             self.tray_icon.show()
@@ -1511,6 +2231,13 @@ class Main(QtWidgets.QWidget):
         if not hasattr(self, "log_window"):
             return
         if checked:
+            self.console.setHtml(
+                "".join(
+                    f"<div>{format_log(f'[{timestamp}] {text}', level)}</div>"
+                    for timestamp, text, level in self._log_entries
+                )
+            )
+            self._scroll_log_to_end()
             self.log_window.show()
             self.log_window.raise_()
             self.log_window.activateWindow()
@@ -1537,12 +2264,9 @@ class Main(QtWidgets.QWidget):
     def on_log_window_closed(self, _result=None):
         if not hasattr(self, "log_toggle_button"):
             return
-        blocker = QtCore.QSignalBlocker(self.log_toggle_button)
-        try:
+        with signals_blocked(self.log_toggle_button):
             self.log_toggle_button.setChecked(False)
             self.log_toggle_button.setText(self.tr("buttons.show_activity_log"))
-        finally:
-            del blocker
 
     def _fit_log_window(self):
         if not hasattr(self, "log_window") or not self.log_window.isVisible():
@@ -1769,14 +2493,36 @@ class Main(QtWidgets.QWidget):
 
     def on_tray_quit(self):
         self._quitting = True
+        self.flush_pending_cmd()
         if self.tray_icon:
             self.tray_icon.hide()
         QtWidgets.QApplication.instance().quit()
 
+    def ensure_tray_menu(self):
+        if hasattr(self, "tray_quit_action"):
+            return
+        menu = self.tray_menu
+        self.tray_show_action = menu.addAction(self.tr("tray.show_window"))
+        self.tray_show_action.triggered.connect(self.show_window_from_tray)
+        menu.addSeparator()
+        self.tray_turn_on_action = menu.addAction(self.tr("tray.turn_on"))
+        self.tray_turn_on_action.triggered.connect(self.on_tray_turn_on)
+        self.tray_turn_off_action = menu.addAction(self.tr("tray.turn_off"))
+        self.tray_turn_off_action.triggered.connect(self.on_tray_turn_off)
+        menu.addSeparator()
+        self.tray_profiles_menu = menu.addMenu(self.tr("tray.profiles"))
+        self.rebuild_tray_profiles_menu()
+        menu.addSeparator()
+        self.tray_quit_action = menu.addAction(self.tr("tray.quit"))
+        self.tray_quit_action.triggered.connect(self.on_tray_quit)
+
     def on_tray_menu_about_to_show(self):
+        self.ensure_tray_menu()
         self.sync_state_from_device()
 
     def on_tray_activated(self, reason):
+        if reason == QtWidgets.QSystemTrayIcon.Context:
+            self.ensure_tray_menu()
         if reason in (
             QtWidgets.QSystemTrayIcon.Trigger,
             QtWidgets.QSystemTrayIcon.Context,
@@ -1817,33 +2563,36 @@ class Main(QtWidgets.QWidget):
         self.sync_state_from_device()
 
     def sync_state_from_device(self):
-        rc, out, err = self.run_cli(
-            ["query", "--brightness", "--state"],
-            log_cmd=False,
-            log_stdout=False,
-            log_stderr=False,
-        )
+        # A scheduled, queued or running apply is about to change the state
+        # being queried.
+        if (
+            self._cli_busy
+            or self._pending_cmd is not None
+            or self._dirty
+            or self.apply_timer.isActive()
+        ):
+            return
+        self._cli_busy = True
+        seq = self._local_seq
+
+        def done(rc, out, err):
+            # The controls changed while the query ran; they win.
+            if seq == self._local_seq:
+                self.on_device_state_synced(rc, out, err)
+            self.end_cli_chain()
+
+        self.start_cli(["query", "--brightness", "--state"], done, **SILENT_CLI)
+
+    def on_device_state_synced(self, rc, out, err):
         if rc != 0:
             message = format_cli_error(rc, out, err)
             self.set_status(message)
             return
 
-        brightness = None
-        state = None
-        for line in (out or "").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            lower = line.lower()
-            if lower in ("on", "off"):
-                state = lower
-            else:
-                try:
-                    brightness = int(line)
-                except ValueError:
-                    continue
+        brightness, state = parse_query_state(out)
 
         if brightness is not None:
+            self._last_applied_brightness = brightness
             prev_suppress = self._suppress
             self._suppress = True
             try:
@@ -1869,6 +2618,7 @@ class Main(QtWidgets.QWidget):
         reverted = self.revert_unsaved_preview(
             self.tr("status.preview_discarded_close")
         )
+        self.flush_pending_cmd()
         if self._quitting:
             return super().closeEvent(event)
         if (
@@ -1908,9 +2658,7 @@ class Main(QtWidgets.QWidget):
         none_label = self.tr("profiles.none_option")
         profile_names = list(self.profile_store["profiles"].keys())
 
-        ac_blocker = QtCore.QSignalBlocker(self.ac_profile_combo)
-        battery_blocker = QtCore.QSignalBlocker(self.battery_profile_combo)
-        try:
+        with signals_blocked(self.ac_profile_combo, self.battery_profile_combo):
             self.ac_profile_combo.clear()
             self.battery_profile_combo.clear()
             self.ac_profile_combo.addItem(none_label, "")
@@ -1931,9 +2679,6 @@ class Main(QtWidgets.QWidget):
             if battery_idx < 0:
                 battery_idx = 0
             self.battery_profile_combo.setCurrentIndex(battery_idx)
-        finally:
-            del ac_blocker
-            del battery_blocker
 
     def on_ac_profile_changed(self, text):
         value = self.ac_profile_combo.currentData() or ""
@@ -1962,10 +2707,73 @@ class Main(QtWidgets.QWidget):
         self.log(t, level=level)
 
     def run_cli(self, args, **kwargs):
+        # Blocks the GUI thread; only the shutdown flush may use it.
+        self.wait_for_cli()
         return run_cmd(args, log_cb=self.log, **kwargs)
 
+    def start_cli(self, args, callback, *, log_cmd=True, log_stdout=True, log_stderr=True):
+        proc = self._cli_proc
+        if proc.state() != QtCore.QProcess.NotRunning:
+            self._cli_callback = None
+            proc.kill()
+            proc.waitForFinished(1000)
+        if log_cmd:
+            self.log("$ " + " ".join(map(shlex.quote, args)), level="cmd")
+        if not TOOL:
+            msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_TOOL_HINT})"
+            self.log(msg, level="error")
+            callback(127, "", msg)
+            return
+        self._cli_callback = callback
+        self._cli_log_flags = (log_stdout, log_stderr)
+        proc.start(TOOL, [str(a) for a in args])
+
+    def _on_cli_done(self, exit_code, _exit_status):
+        callback = self._cli_callback
+        self._cli_callback = None
+        if callback is None:
+            return
+        proc = self._cli_proc
+        stdout = bytes(proc.readAllStandardOutput()).decode("utf-8", "replace").strip()
+        stderr = bytes(proc.readAllStandardError()).decode("utf-8", "replace").strip()
+        log_stdout, log_stderr = self._cli_log_flags
+        if stdout and log_stdout:
+            self.log(stdout, level="stdout")
+        if stderr and log_stderr:
+            self.log(stderr, level="stderr")
+        callback(exit_code, stdout, stderr)
+
+    def _on_cli_error(self, error):
+        if error != QtCore.QProcess.FailedToStart:
+            return
+        callback = self._cli_callback
+        self._cli_callback = None
+        if callback is None:
+            return
+        msg = f"{MISSING_TOOL_MESSAGE} (candidati: {_TOOL_HINT})"
+        self.log(msg, level="error")
+        callback(127, "", msg)
+
+    def wait_for_cli(self, timeout_ms=3000):
+        if self._cli_proc.state() != QtCore.QProcess.NotRunning:
+            self._cli_proc.waitForFinished(timeout_ms)
+
+    def cancel_cli(self):
+        self._pending_cmd = None
+        self.cli_timer.stop()
+        self._cli_seq += 1
+        self._cli_busy = False
+        self._cli_callback = None
+        self._static_step = None
+        if self._cli_proc.state() != QtCore.QProcess.NotRunning:
+            self._cli_proc.kill()
+            self._cli_proc.waitForFinished(1000)
+
     def detect_device(self):
-        rc, out, err = self.run_cli(["query", "--devices"])
+        self._cli_busy = True
+        self.start_cli(["query", "--devices"], self.on_device_detected)
+
+    def on_device_detected(self, rc, out, err):
         if rc == 0:
             self.hardware_detected = True
             msg = (out or "").strip() or self.tr("status.device_detected")
@@ -1976,27 +2784,25 @@ class Main(QtWidgets.QWidget):
             self.hardware_detected = False
             self.hardware_label.setText(self.tr("hero.hardware_unknown"))
             self.set_status(format_cli_error(rc, out, err))
+            self.end_cli_chain()
 
     def sync_initial_state(self):
-        rc, out, err = self.run_cli(["query", "--brightness", "--state"])
+        seq = self._local_seq
+
+        def done(rc, out, err):
+            # A restored profile or a local change already set the controls.
+            if seq == self._local_seq and self._pending_cmd is None:
+                self.on_initial_state_synced(rc, out, err)
+            self.end_cli_chain()
+
+        self.start_cli(["query", "--brightness", "--state"], done)
+
+    def on_initial_state_synced(self, rc, out, err):
         if rc != 0:
             self.set_status(format_cli_error(rc, out, err))
             return
 
-        brightness = None
-        state = None
-        for line in (out or "").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            lower = line.lower()
-            if lower in ("on", "off"):
-                state = lower
-            else:
-                try:
-                    brightness = int(line)
-                except ValueError:
-                    continue
+        brightness, state = parse_query_state(out)
 
         if brightness is not None:
             self.last_brightness = brightness
@@ -2011,482 +2817,11 @@ class Main(QtWidgets.QWidget):
         self.update_power_button()
 
     def apply_styles(self):
-        base = """
-        #MainView {
-            background-color: #f6f8fb;
-        }
-        #logWindow {
-            background-color: #eef2f7;
-            background-image: radial-gradient(circle at 15% 15%, rgba(59, 130, 246, 0.12), transparent 55%);
-        }
-        #AppSurface {
-            background-color: transparent;
-        }
-        QLabel, QCheckBox, QToolButton {
-            color: #1f2933;
-            font-size: 13px;
-        }
-        #heroTitle {
-            font-size: 28px;
-            font-weight: 700;
-            color: #0f172a;
-        }
-        #heroSubtitle {
-            font-size: 14px;
-            color: #52606d;
-        }
-        #heroCard {
-            background-color: #ffffff;
-            border-radius: 20px;
-            border: 1px solid rgba(15, 33, 55, 0.08);
-            background-image: radial-gradient(circle at 15% 20%, rgba(79, 209, 197, 0.25), transparent 60%),
-                              radial-gradient(circle at 85% 10%, rgba(99, 102, 241, 0.2), transparent 45%);
-        }
-        #heroCaption {
-            font-size: 11px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            color: #738095;
-        }
-        #hardwareBadge {
-            padding: 6px 12px;
-            border-radius: 999px;
-            background: rgba(59, 130, 246, 0.12);
-            color: #1d4ed8;
-            font-weight: 600;
-        }
-        #pillButton {
-            padding: 9px 18px;
-            border-radius: 999px;
-            font-weight: 600;
-            border: 1px solid rgba(148,163,184,0.45);
-            color: #0f172a;
-            background-color: #ffffff;
-        }
-        #pillButton:checked {
-            background-color: #3b82f6;
-            border: none;
-            color: #ffffff;
-        }
-        #surfaceCard {
-            background-color: #ffffff;
-            border-radius: 20px;
-            border: 1px solid rgba(15, 23, 42, 0.05);
-        }
-        #sectionTitle {
-            font-size: 17px;
-            font-weight: 600;
-            color: #111827;
-        }
-        #sectionSubtitle {
-            font-size: 13px;
-            color: #5f6b7a;
-        }
-        QComboBox, QSpinBox, QTextEdit {
-            padding: 8px 12px;
-            border-radius: 12px;
-            border: 1px solid rgba(148, 163, 184, 0.4);
-            background-color: #f9fafc;
-            color: #1f2933;
-        }
-        QComboBox::drop-down {
-            border: none;
-        }
-        QSlider::groove:horizontal {
-            height: 6px;
-            border-radius: 3px;
-            background: rgba(148, 163, 184, 0.35);
-        }
-        QSlider::handle:horizontal {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                        stop:0 #34d399, stop:1 #60a5fa);
-            border: 2px solid #22c55e;
-            border-radius: 10px;
-            width: 20px;
-            margin: -7px 0;
-        }
-        QSlider::sub-page:horizontal {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 #38bdf8, stop:1 #a855f7);
-            border-radius: 3px;
-        }
-        QPushButton {
-            padding: 11px 18px;
-            border-radius: 12px;
-            font-weight: 600;
-            border: 1px solid rgba(37, 99, 235, 0.15);
-            background: #ffffff;
-            color: #1f2933;
-        }
-        QPushButton:hover {
-            border-color: rgba(37, 99, 235, 0.4);
-        }
-        QPushButton:pressed {
-            background: #e2e8f0;
-        }
-        QPushButton:disabled {
-            border: 1px solid rgba(148, 163, 184, 0.3);
-            background: #f1f5f9;
-            color: rgba(57, 77, 96, 0.6);
-        }
-        QPushButton:focus {
-            outline: 0;
-            border-color: rgba(99, 102, 241, 0.8);
-        }
-        #powerButton {
-            font-size: 16px;
-            text-transform: uppercase;
-            letter-spacing: 0.02em;
-            border: none;
-            color: #ffffff;
-        }
-        #powerButton[powerState="off"] {
-            background-color: #16a34a;
-        }
-        #powerButton[powerState="on"] {
-            background-color: #dc2626;
-        }
-        QTextEdit {
-            min-height: 160px;
-        }
-        #logView {
-            background-color: #0b1120;
-            color: #e2e8f0;
-            border: 1px solid rgba(15, 23, 42, 0.6);
-        }
-        #helperRow {
-            background-color: #f9fafc;
-            border-radius: 14px;
-            border: 1px solid rgba(148, 163, 184, 0.35);
-        }
-        #helperInfoButton {
-            border-radius: 999px;
-            background: rgba(148, 163, 184, 0.3);
-            color: #0f172a;
-            font-weight: 700;
-        }
-        #helperLabel {
-            font-weight: 600;
-            color: #1f2933;
-        }
-        #helperFlag {
-            font-weight: 600;
-        }
-        #helperDetail {
-            color: #4b5563;
-            font-size: 12px;
-        }
-        QCheckBox::indicator {
-            width: 20px;
-            height: 20px;
-        }
-        QCheckBox::indicator:unchecked {
-            border-radius: 6px;
-            border: 1px solid rgba(148, 163, 184, 0.7);
-            background-color: #ffffff;
-        }
-        QCheckBox::indicator:checked {
-            border-radius: 6px;
-            border: none;
-            background-color: #3b82f6;
-        }
-        QPushButton#helperFlag {
-            padding: 8px 22px;
-            border-radius: 16px;
-            border: 2px solid #94a3b8;
-            background-color: #ffffff;
-            font-weight: 600;
-            color: #1f2933;
-        }
-        QPushButton#helperFlag:checked {
-            border: 2px solid #16a34a;
-            color: #ffffff;
-            background-color: #16a34a;
-        }
-        QPushButton#helperFlag:disabled {
-            background-color: #f1f5f9;
-            color: #94a3b8;
-            border: 2px solid #cbd5e1;
-        }
-        QPushButton#applyButton {
-            padding: 8px 22px;
-            border-radius: 16px;
-            border: 2px solid #94a3b8;
-            background-color: #ffffff;
-            font-weight: 600;
-            color: #1f2933;
-        }
-        QPushButton#applyButton:enabled {
-            border: 2px solid #16a34a;
-            color: #ffffff;
-            background-color: #16a34a;
-        }
-        QPushButton#applyButton:disabled {
-            background-color: #f1f5f9;
-            color: #94a3b8;
-            border: 2px solid #cbd5e1;
-        }
-        """
-        dark = """
-        #MainView {
-            background-color: #0f172a;
-        }
-        #logWindow {
-            background-color: #0b1220;
-            background-image: radial-gradient(circle at 15% 15%, rgba(59, 130, 246, 0.18), transparent 55%);
-        }
-        #AppSurface {
-            background-color: transparent;
-        }
-        QLabel, QCheckBox, QToolButton {
-            color: #e2e8f0;
-            font-size: 13px;
-        }
-        #heroTitle {
-            font-size: 28px;
-            font-weight: 700;
-            color: #f1f5f9;
-        }
-        #heroSubtitle {
-            font-size: 14px;
-            color: #94a3b8;
-        }
-        #heroCard {
-            background-color: #1e293b;
-            border-radius: 20px;
-            border: 1px solid rgba(148, 163, 184, 0.15);
-            background-image: radial-gradient(circle at 15% 20%, rgba(79, 209, 197, 0.15), transparent 60%),
-                              radial-gradient(circle at 85% 10%, rgba(99, 102, 241, 0.12), transparent 45%);
-        }
-        #heroCaption {
-            font-size: 11px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            color: #64748b;
-        }
-        #hardwareBadge {
-            padding: 6px 12px;
-            border-radius: 999px;
-            background: rgba(59, 130, 246, 0.2);
-            color: #60a5fa;
-            font-weight: 600;
-        }
-        #pillButton {
-            padding: 9px 18px;
-            border-radius: 999px;
-            font-weight: 600;
-            border: 1px solid rgba(148,163,184,0.3);
-            color: #e2e8f0;
-            background-color: #1e293b;
-        }
-        #pillButton:checked {
-            background-color: #3b82f6;
-            border: none;
-            color: #ffffff;
-        }
-        #surfaceCard {
-            background-color: #1e293b;
-            border-radius: 20px;
-            border: 1px solid rgba(148, 163, 184, 0.1);
-        }
-        #sectionTitle {
-            font-size: 17px;
-            font-weight: 700;
-            color: #f1f5f9;
-        }
-        #sectionSubtitle {
-            font-size: 13px;
-            color: #94a3b8;
-        }
-        QComboBox {
-            padding: 10px 14px;
-            border-radius: 10px;
-            border: 1px solid rgba(148, 163, 184, 0.3);
-            background-color: #0f172a;
-            color: #e2e8f0;
-            font-size: 13px;
-        }
-        QComboBox:hover {
-            border-color: rgba(99, 102, 241, 0.5);
-        }
-        QComboBox::drop-down {
-            border: none;
-        }
-        QSlider::groove:horizontal {
-            height: 6px;
-            border-radius: 3px;
-            background: rgba(148, 163, 184, 0.25);
-        }
-        QSlider::handle:horizontal {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                        stop:0 #34d399, stop:1 #60a5fa);
-            border: 2px solid #22c55e;
-            border-radius: 10px;
-            width: 20px;
-            margin: -7px 0;
-        }
-        QSlider::sub-page:horizontal {
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 #38bdf8, stop:1 #a855f7);
-            border-radius: 3px;
-        }
-        QSpinBox {
-            padding: 10px 14px;
-            border-radius: 10px;
-            border: 1px solid rgba(148, 163, 184, 0.3);
-            background-color: #0f172a;
-            color: #e2e8f0;
-            font-size: 13px;
-        }
-        QPushButton {
-            padding: 11px 18px;
-            border-radius: 12px;
-            font-weight: 600;
-            border: 1px solid rgba(148, 163, 184, 0.3);
-            background: #1e293b;
-            color: #e2e8f0;
-        }
-        QPushButton:hover {
-            border-color: rgba(99, 102, 241, 0.5);
-        }
-        QPushButton:pressed {
-            background: #334155;
-            color: #e2e8f0;
-        }
-        QPushButton:disabled {
-            border: 1px solid rgba(148, 163, 184, 0.2);
-            background: #1e293b;
-            color: rgba(148, 163, 184, 0.5);
-        }
-        QPushButton:focus {
-            outline: 0;
-            border-color: rgba(99, 102, 241, 0.8);
-        }
-        #powerButton {
-            font-size: 16px;
-            text-transform: uppercase;
-            letter-spacing: 0.02em;
-            border: none;
-            color: #ffffff;
-        }
-        #powerButton[powerState="off"] {
-            background-color: #16a34a;
-        }
-        #powerButton[powerState="on"] {
-            background-color: #dc2626;
-        }
-        QTextEdit {
-            min-height: 160px;
-        }
-        #logView {
-            background-color: #020617;
-            color: #e2e8f0;
-            border: 1px solid rgba(148, 163, 184, 0.2);
-        }
-        #helperRow {
-            background-color: #0f172a;
-            border-radius: 14px;
-            border: 1px solid rgba(148, 163, 184, 0.2);
-        }
-        #helperInfoButton {
-            border-radius: 999px;
-            background: rgba(148, 163, 184, 0.2);
-            color: #e2e8f0;
-            font-weight: 700;
-        }
-        #helperLabel {
-            font-weight: 600;
-            color: #e2e8f0;
-        }
-        #helperFlag {
-            font-weight: 600;
-        }
-        #helperDetail {
-            color: #94a3b8;
-            font-size: 12px;
-        }
-        QCheckBox::indicator {
-            width: 20px;
-            height: 20px;
-        }
-        QCheckBox::indicator:unchecked {
-            border-radius: 6px;
-            border: 1px solid rgba(148, 163, 184, 0.5);
-            background-color: #1e293b;
-        }
-        QCheckBox::indicator:checked {
-            border-radius: 6px;
-            border: none;
-            background-color: #3b82f6;
-        }
-        QPushButton#helperFlag {
-            padding: 8px 22px;
-            border-radius: 16px;
-            border: 2px solid #64748b;
-            background-color: #1e293b;
-            font-weight: 600;
-            color: #e2e8f0;
-        }
-        QPushButton#helperFlag:checked {
-            border: 2px solid #16a34a;
-            color: #ffffff;
-            background-color: #16a34a;
-        }
-        QPushButton#helperFlag:disabled {
-            background-color: #1e293b;
-            color: #64748b;
-            border: 2px solid #334155;
-        }
-        QPushButton#applyButton {
-            padding: 8px 22px;
-            border-radius: 16px;
-            border: 2px solid #64748b;
-            background-color: #1e293b;
-            font-weight: 600;
-            color: #e2e8f0;
-        }
-        QPushButton#applyButton:enabled {
-            border: 2px solid #16a34a;
-            color: #ffffff;
-            background-color: #16a34a;
-        }
-        QPushButton#applyButton:disabled {
-            background-color: #1e293b;
-            color: #64748b;
-            border: 2px solid #334155;
-        }
-        QMessageBox {
-            background-color: #1e293b;
-            color: #e2e8f0;
-        }
-        QMessageBox QLabel {
-            color: #e2e8f0;
-        }
-        QMessageBox QPushButton {
-            min-width: 80px;
-            padding: 8px 16px;
-        }
-        QInputDialog {
-            background-color: #1e293b;
-            color: #e2e8f0;
-        }
-        QInputDialog QLabel {
-            color: #e2e8f0;
-        }
-        QInputDialog QLineEdit {
-            padding: 10px 14px;
-            border-radius: 10px;
-            border: 1px solid rgba(148, 163, 184, 0.3);
-            background-color: #0f172a;
-            color: #e2e8f0;
-            font-size: 13px;
-        }
-        """
         if self.settings.get("dark_mode", False):
-            self.setStyleSheet(dark)
+            self.setStyleSheet(_DARK_QSS)
             self._style_combobox_views("#1e293b", "#e2e8f0")
         else:
-            self.setStyleSheet(base)
+            self.setStyleSheet(_BASE_QSS)
             self._style_combobox_views("#ffffff", "#1f2933")
         if hasattr(self, "log_window"):
             self.log_window.setStyleSheet(self.styleSheet())
@@ -2522,21 +2857,20 @@ class Main(QtWidgets.QWidget):
         finally:
             self._suppress = prev_suppress
 
-        blockers = [
-            QtCore.QSignalBlocker(self.mode),
-            QtCore.QSignalBlocker(self.static_color),
-            QtCore.QSignalBlocker(self.speed),
-            QtCore.QSignalBlocker(self.color),
-            QtCore.QSignalBlocker(self.direction),
-            QtCore.QSignalBlocker(self.reactive),
-        ]
-        try:
-            mode_value = sanitize_choice(data.get("mode"), EFFECTS, "static")
+        with signals_blocked(
+            self.mode,
+            self.static_color,
+            self.speed,
+            self.color,
+            self.direction,
+            self.reactive,
+        ):
+            mode_value = sanitize_choice(data.get("mode"), EFFECTS_SET, "static")
             if not set_combo_by_data(self.mode, mode_value):
                 set_combo_by_data(self.mode, "static")
 
             static_value = sanitize_choice(
-                data.get("static_color"), COLORS, self.last_static_color
+                data.get("static_color"), COLORS_SET, self.last_static_color
             )
             if not set_combo_by_data(self.static_color, static_value):
                 set_combo_by_data(self.static_color, self.last_static_color)
@@ -2553,7 +2887,7 @@ class Main(QtWidgets.QWidget):
             self.speed.setValue(clamp_int(data.get("speed"), 0, 10, self.speed.value()))
 
             color_value = data.get("color") or "none"
-            if color_value != "none" and color_value not in COLORS:
+            if color_value != "none" and color_value not in COLORS_SET:
                 color_value = "none"
             set_combo_by_data(self.color, color_value)
 
@@ -2561,13 +2895,12 @@ class Main(QtWidgets.QWidget):
             self.reactive.setChecked(reactive_value)
 
             direction_value = sanitize_choice(
-                data.get("direction"), DIRECTIONS, (self.direction.currentData() or "none")
+                data.get("direction"), DIRECTIONS_SET, (self.direction.currentData() or "none")
             )
             if reactive_value:
                 direction_value = "none"
             set_combo_by_data(self.direction, direction_value)
-        finally:
-            del blockers
+        self.sync_control_shadows()
 
         self.update_panels()
         self.set_profile_dirty(False)
@@ -2596,8 +2929,19 @@ class Main(QtWidgets.QWidget):
             self.set_profile_dirty(False)
             return
         current = self.capture_profile_state()
+        self._captured_state = current
         self.set_profile_dirty(current != self.profile_data)
 
+    def refresh_brightness_dirty_state(self, v):
+        # Every other control refreshes the full capture when it changes, so
+        # only the brightness field of the last capture can be out of date.
+        state = self._captured_state
+        if state is None or not self.profile_data:
+            self.refresh_profile_dirty_state()
+            return
+        state["brightness"] = v
+        self.set_profile_dirty(state != self.profile_data)
+
     def confirm_profile_switch(self, target_name):
         self.refresh_profile_dirty_state()
         if not self._profile_dirty:
@@ -2638,16 +2982,15 @@ class Main(QtWidgets.QWidget):
             return False
         if not self.profile_data:
             return False
-        self.apply_timer.stop()
-        self.brightness_timer.stop()
-        saved_state = dict(self.profile_data)
+        self.cancel_scheduled_apply()
+        saved_state = self.profile_data
         self.load_profile_into_controls(saved_state)
         brightness = clamp_int(
             saved_state.get("brightness"), 0, 50, self.last_brightness
         )
         if brightness <= 0:
             self.is_off = True
-            self.run_cli(["off"], log_cmd=False, log_stdout=False, log_stderr=False)
+            self.start_off(log_cmd=False, log_stdout=False, log_stderr=False)
         else:
             self.is_off = False
             self.apply_current_mode()
@@ -2657,18 +3000,18 @@ class Main(QtWidgets.QWidget):
         return True
 
     def capture_profile_state(self):
-        mode_value = sanitize_choice(self.mode.currentData(), EFFECTS, "static")
+        mode_value = sanitize_choice(self.mode.currentData(), EFFECTS_SET, "static")
         static_value = sanitize_choice(
-            self.static_color.currentData(), COLORS, self.last_static_color
+            self.static_color.currentData(), COLORS_SET, self.last_static_color
         )
         self.last_static_color = static_value
 
         color_value = self.color.currentData() or "none"
-        if color_value != "none" and color_value not in COLORS:
+        if color_value != "none" and color_value not in COLORS_SET:
             color_value = "none"
 
         direction_value = self.direction.currentData()
-        if direction_value not in DIRECTIONS:
+        if direction_value not in DIRECTIONS_SET:
             direction_value = "none"
 
         reactive_value = bool(self.reactive.isChecked())
@@ -2688,43 +3031,63 @@ class Main(QtWidgets.QWidget):
 
     def persist_profile(self):
         state = self.capture_profile_state()
-        self.update_active_profile_state(state)
-        self.save_profile_store()
+        if self.update_active_profile_state(state):
+            self.save_profile_store()
         self.set_profile_dirty(False)
 
     def update_active_profile_state(self, state):
-        self.profile_store["profiles"][self.active_profile_name] = dict(state)
-        self.profile_store["active"] = self.active_profile_name
-        self.profile_data = dict(state)
+        name = self.active_profile_name
+        current = self.profile_store["profiles"].setdefault(name, {})
+        if current == state and self.profile_store["active"] == name:
+            return False
+        current.clear()
+        current.update(state)
+        self.profile_store["active"] = name
+        self.profile_data = current
+        return True
 
     def save_profile_store(self):
+        # Only explicit user actions get here, so there is nothing to coalesce;
+        # an unchanged store is still not rewritten.
+        blob = _dump_json_bytes(self.profile_store)
+        if blob == self._last_written_blob:
+            return
         try:
-            self._ignore_profile_events = True
-            write_profile_store(self.profile_store)
-            self.watch_profile_paths()
+            write_profile_bytes(blob)
         except OSError as exc:
             self.set_status(
                 self.tr("status.profile_save_failed", error=str(exc)),
                 level="error",
             )
-        finally:
-            self._ignore_profile_events = False
+            return
+        self._last_written_blob = blob
+        # inotify reports our own replace after the write returns; the
+        # recorded signature lets the watcher tell it from an external edit.
+        self._profile_file_sig = profile_file_signature()
+        self.watch_profile_paths()
+
+    def remember_loaded_profile_store(self):
+        # What is on disk needs no write until the store actually changes.
+        if self._profile_file_sig is not None:
+            self._last_written_blob = _dump_json_bytes(self.profile_store)
 
     def refresh_profile_combo(self):
         if not hasattr(self, "profile_combo"):
             return
-        blocker = QtCore.QSignalBlocker(self.profile_combo)
+        combo = self.profile_combo
+        names = list(self.profile_store["profiles"])
         self._updating_profile_combo = True
         try:
-            self.profile_combo.clear()
-            for name in self.profile_store["profiles"].keys():
-                self.profile_combo.addItem(name)
-            idx = self.profile_combo.findText(self.active_profile_name)
-            if idx >= 0:
-                self.profile_combo.setCurrentIndex(idx)
+            with signals_blocked(combo):
+                # Switching profiles only moves the selection; rebuild on renames etc.
+                if names != [combo.itemText(i) for i in range(combo.count())]:
+                    combo.clear()
+                    combo.addItems(names)
+                idx = combo.findText(self.active_profile_name)
+                if idx >= 0:
+                    combo.setCurrentIndex(idx)
         finally:
             self._updating_profile_combo = False
-            del blocker
         self.rebuild_tray_profiles_menu()
         self.refresh_power_profile_combos()
 
@@ -2736,13 +3099,18 @@ class Main(QtWidgets.QWidget):
         self.switch_active_profile(name, triggered_by_user=True)
 
     def prompt_profile_name(self, title, label, initial=""):
-        text, ok = QtWidgets.QInputDialog.getText(self, title, label, text=initial)
-        if not ok:
+        dialog = self._name_dialog
+        if dialog is None:
+            dialog = self._name_dialog = QtWidgets.QInputDialog(self)
+            dialog.setInputMode(QtWidgets.QInputDialog.TextInput)
+        dialog.setWindowTitle(title)
+        dialog.setLabelText(label)
+        dialog.setTextValue(initial)
+        if dialog.exec() != QtWidgets.QDialog.Accepted:
             return None
-        name = text.strip()
+        name = dialog.textValue().strip()
         if not name:
-            QtWidgets.QMessageBox.warning(
-                self,
+            self.show_warning(
                 self.tr("dialogs.profile.invalid_title"),
                 self.tr("dialogs.profile.invalid_message"),
             )
@@ -2754,8 +3122,7 @@ class Main(QtWidgets.QWidget):
         self.set_status(self.tr("status.profile_saved", name=self.active_profile_name))
 
     def on_apply_clicked(self):
-        self.apply_timer.stop()
-        self.brightness_timer.stop()
+        self.cancel_scheduled_apply()
         self.persist_profile()
         if not self.is_off:
             self.apply_current_mode()
@@ -2769,21 +3136,49 @@ class Main(QtWidgets.QWidget):
         if not name:
             return
         if name in self.profile_store["profiles"]:
-            QtWidgets.QMessageBox.warning(
-                self,
+            self.show_warning(
                 self.tr("dialogs.profile.name_in_use_title"),
                 self.tr("dialogs.profile.name_in_use_message"),
             )
             return
-        self.profile_store["profiles"][name] = dict(DEFAULT_PROFILE_STATE)
+        self.profile_data = dict(DEFAULT_PROFILE_STATE)
+        self.profile_store["profiles"][name] = self.profile_data
         self.active_profile_name = name
         self.profile_store["active"] = name
-        self.profile_data = dict(DEFAULT_PROFILE_STATE)
         self.save_profile_store()
         self.refresh_profile_combo()
         self.load_profile_into_controls(self.profile_data)
         self.set_status(self.tr("status.profile_created", name=name))
 
+    def show_warning(self, title, text):
+        box = self._warning_box
+        if box is None:
+            box = self._warning_box = QtWidgets.QMessageBox(self)
+            box.setIcon(QtWidgets.QMessageBox.Warning)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.exec()
+
+    def ask_question(self, title, text, on_yes):
+        # open() keeps the dialog window-modal without a nested event loop, so
+        # CLI callbacks keep flowing while it is up.
+        box = self._question_box
+        if box is None:
+            box = self._question_box = QtWidgets.QMessageBox(self)
+            box.setIcon(QtWidgets.QMessageBox.Question)
+            box.setStandardButtons(QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+            box.finished.connect(self.on_question_finished)
+        box.setWindowTitle(title)
+        box.setText(text)
+        self._question_on_yes = on_yes
+        box.open()
+
+    def on_question_finished(self, _result):
+        box = self._question_box
+        on_yes, self._question_on_yes = self._question_on_yes, None
+        if on_yes and box.standardButton(box.clickedButton()) == QtWidgets.QMessageBox.Yes:
+            on_yes()
+
     def on_profile_save_as_clicked(self):
         name = self.prompt_profile_name(
             self.tr("dialogs.profile.save_title"),
@@ -2793,17 +3188,19 @@ class Main(QtWidgets.QWidget):
         if not name:
             return
         if name in self.profile_store["profiles"] and name != self.active_profile_name:
-            reply = QtWidgets.QMessageBox.question(
-                self,
+            self.ask_question(
                 self.tr("dialogs.profile.overwrite_title"),
                 self.tr("dialogs.profile.overwrite_message", name=name),
+                lambda: self.save_profile_as(name),
             )
-            if reply != QtWidgets.QMessageBox.Yes:
-                return
+            return
+        self.save_profile_as(name)
+
+    def save_profile_as(self, name):
         self.active_profile_name = name
         state = self.capture_profile_state()
-        self.update_active_profile_state(state)
-        self.save_profile_store()
+        if self.update_active_profile_state(state):
+            self.save_profile_store()
         self.refresh_profile_combo()
         self.set_profile_dirty(False)
         self.set_status(self.tr("status.profile_saved", name=name))
@@ -2817,8 +3214,7 @@ class Main(QtWidgets.QWidget):
         if not new_name or new_name == self.active_profile_name:
             return
         if new_name in self.profile_store["profiles"]:
-            QtWidgets.QMessageBox.warning(
-                self,
+            self.show_warning(
                 self.tr("dialogs.profile.name_in_use_title"),
                 self.tr("dialogs.profile.rename_in_use_message"),
             )
@@ -2828,30 +3224,33 @@ class Main(QtWidgets.QWidget):
         )
         self.active_profile_name = new_name
         self.profile_store["active"] = new_name
-        self.profile_data = dict(self.profile_store["profiles"][new_name])
+        self.profile_data = self.profile_store["profiles"][new_name]
         self.save_profile_store()
         self.refresh_profile_combo()
         self.set_status(self.tr("status.profile_renamed", name=new_name))
 
     def on_profile_delete_clicked(self):
         if len(self.profile_store["profiles"]) <= 1:
-            QtWidgets.QMessageBox.warning(
-                self,
+            self.show_warning(
                 self.tr("dialogs.profile.cannot_delete_title"),
                 self.tr("dialogs.profile.cannot_delete_message"),
             )
             return
-        reply = QtWidgets.QMessageBox.question(
-            self,
+        name = self.active_profile_name
+        self.ask_question(
             self.tr("dialogs.profile.delete_title"),
-            self.tr("dialogs.profile.delete_message", name=self.active_profile_name),
+            self.tr("dialogs.profile.delete_message", name=name),
+            lambda: self.delete_profile(name),
         )
-        if reply != QtWidgets.QMessageBox.Yes:
+
+    def delete_profile(self, name):
+        # The store may have been reloaded while the question was open.
+        if name != self.active_profile_name or len(self.profile_store["profiles"]) <= 1:
             return
         del self.profile_store["profiles"][self.active_profile_name]
         self.active_profile_name = next(iter(self.profile_store["profiles"].keys()))
         self.profile_store["active"] = self.active_profile_name
-        self.profile_data = dict(self.profile_store["profiles"][self.active_profile_name])
+        self.profile_data = self.profile_store["profiles"][self.active_profile_name]
         self.save_profile_store()
         self.refresh_profile_combo()
         self.load_profile_into_controls(self.profile_data)
@@ -2871,7 +3270,7 @@ class Main(QtWidgets.QWidget):
             return False
         self.active_profile_name = name
         self.profile_store["active"] = name
-        self.profile_data = dict(self.profile_store["profiles"][name])
+        self.profile_data = self.profile_store["profiles"][name]
         self.save_profile_store()
         self.refresh_profile_combo()
         self.load_profile_into_controls(self.profile_data)
@@ -2881,7 +3280,7 @@ class Main(QtWidgets.QWidget):
         return True
 
     def refresh_autostart_flag(self, detail_text=None):
-        state = is_autostart_enabled()
+        state = self._autostart_cached
         self.autostart_enabled = state
         status_label = (
             self.tr("status.enabled") if state else self.tr("status.disabled")
@@ -2894,12 +3293,9 @@ class Main(QtWidgets.QWidget):
                 self.autostart_status_label.clear()
                 self.autostart_status_label.setVisible(False)
         if hasattr(self, "autostart_flag"):
-            blocker = QtCore.QSignalBlocker(self.autostart_flag)
-            try:
+            with signals_blocked(self.autostart_flag):
                 self.autostart_flag.setChecked(state)
                 self.autostart_flag.setText(status_label)
-            finally:
-                del blocker
 
     def on_autostart_flag_changed(self, value):
         desired = bool(value)
@@ -2922,132 +3318,95 @@ class Main(QtWidgets.QWidget):
         except OSError as exc:
             error = self.tr("status.autostart_error", error=str(exc))
             self.set_status(error, level="error")
-            blocker = QtCore.QSignalBlocker(self.autostart_flag)
-            try:
+            with signals_blocked(self.autostart_flag):
                 self.autostart_flag.setChecked(self.autostart_enabled)
-            finally:
-                del blocker
             self.refresh_autostart_flag(detail_text=error)
             return
+        self._autostart_cached = is_autostart_enabled()
+        self.watch_profile_paths()
         self.refresh_autostart_flag()
 
-    def refresh_resume_controls(self):
-        status_enabled, status_text = is_resume_service_enabled()
-        self.resume_enabled = status_enabled
-        self.resume_status = status_text
-        if hasattr(self, "resume_status_label"):
+    def unit_states(self):
+        # Enablement can also change outside the GUI (systemctl enable/disable
+        # touches no watched path), so the listing is only trusted briefly.
+        now = time.monotonic()
+        if self._unit_states is None or now - self._unit_states_ts > UNIT_STATES_TTL:
+            self._unit_states = load_unit_states()
+            self._unit_states_ts = now
+        return self._unit_states
+
+    def service_status(self, name, check):
+        if self._unit_files is None:
+            self._unit_files = scan_systemd_user_dir()
+        # Our units only ever live in SYSTEMD_USER_DIR; without the file there
+        # is nothing systemctl could report as enabled. Without systemctl the
+        # check still runs so the controls show it as unavailable.
+        if _SYSTEMCTL is not None and not self._unit_files.get(name):
+            return False, "Disabled"
+        return check(self.unit_states())
+
+    def refresh_service_controls(self, prefix):
+        unit, check, _enable, _disable, unavailable_key = SERVICE_CONTROLS[prefix]
+        status_enabled, status_text = self.service_status(unit, check)
+        setattr(self, f"{prefix}_enabled", status_enabled)
+        setattr(self, f"{prefix}_status", status_text)
+        label = getattr(self, f"{prefix}_status_label", None)
+        if label is not None:
             detail_text = (
                 status_text
                 if status_text and status_text not in ("Enabled", "Disabled")
                 else ""
             )
-            self.resume_status_label.setText(detail_text)
-            self.resume_status_label.setVisible(bool(detail_text))
-        if hasattr(self, "resume_flag"):
-            blocker = QtCore.QSignalBlocker(self.resume_flag)
-            try:
-                self.resume_flag.setChecked(status_enabled)
-                self.resume_flag.setText(
+            label.setText(detail_text)
+            label.setVisible(bool(detail_text))
+        flag = getattr(self, f"{prefix}_flag", None)
+        if flag is not None:
+            with signals_blocked(flag):
+                flag.setChecked(status_enabled)
+                flag.setText(
                     self.tr("status.enabled")
                     if status_enabled
                     else self.tr("status.disabled")
                 )
                 disabled = status_text == "systemctl not available"
-                self.resume_flag.setEnabled(not disabled)
-                if disabled:
-                    self.resume_flag.setToolTip(
-                        self.tr("status.systemctl_unavailable")
-                    )
-                else:
-                    self.resume_flag.setToolTip("")
-            finally:
-                del blocker
+                flag.setEnabled(not disabled)
+                flag.setToolTip(self.tr(unavailable_key) if disabled else "")
 
-    def on_resume_flag_changed(self, value):
+    def on_service_flag_changed(self, prefix, value):
+        _unit, _check, enable, disable, _key = SERVICE_CONTROLS[prefix]
+        enabled = getattr(self, f"{prefix}_enabled")
+        flag = getattr(self, f"{prefix}_flag")
         desired = bool(value)
-        if desired == self.resume_enabled:
+        if desired == enabled:
             return
-        if self.resume_status == "systemctl not available":
-            blocker = QtCore.QSignalBlocker(self.resume_flag)
-            try:
-                self.resume_flag.setChecked(self.resume_enabled)
-            finally:
-                del blocker
+        if getattr(self, f"{prefix}_status") == "systemctl not available":
+            with signals_blocked(flag):
+                flag.setChecked(enabled)
             return
-        if desired:
-            ok, message = enable_resume_service()
-        else:
-            ok, message = disable_resume_service()
+        ok, message = enable() if desired else disable()
         if ok:
             self.set_status(message)
         else:
             self.set_status(message, level="error")
-            blocker = QtCore.QSignalBlocker(self.resume_flag)
-            try:
-                self.resume_flag.setChecked(self.resume_enabled)
-            finally:
-                del blocker
+            with signals_blocked(flag):
+                flag.setChecked(enabled)
             return
-        self.refresh_resume_controls()
+        self._unit_states = None
+        self._unit_files = None
+        self.watch_profile_paths()
+        self.refresh_service_controls(prefix)
+
+    def refresh_resume_controls(self):
+        self.refresh_service_controls("resume")
+
+    def on_resume_flag_changed(self, value):
+        self.on_service_flag_changed("resume", value)
 
     def refresh_power_monitor_controls(self):
-        status_enabled, status_text = is_power_monitor_enabled()
-        self.power_monitor_enabled = status_enabled
-        self.power_monitor_status = status_text
-        if hasattr(self, "power_monitor_status_label"):
-            detail_text = (
-                status_text
-                if status_text and status_text not in ("Enabled", "Disabled")
-                else ""
-            )
-            self.power_monitor_status_label.setText(detail_text)
-            self.power_monitor_status_label.setVisible(bool(detail_text))
-        if hasattr(self, "power_monitor_flag"):
-            blocker = QtCore.QSignalBlocker(self.power_monitor_flag)
-            try:
-                self.power_monitor_flag.setChecked(status_enabled)
-                self.power_monitor_flag.setText(
-                    self.tr("status.enabled")
-                    if status_enabled
-                    else self.tr("status.disabled")
-                )
-                disabled = status_text == "systemctl not available"
-                self.power_monitor_flag.setEnabled(not disabled)
-                if disabled:
-                    self.power_monitor_flag.setToolTip(
-                        self.tr("status.systemctl_unavailable_monitor")
-                    )
-                else:
-                    self.power_monitor_flag.setToolTip("")
-            finally:
-                del blocker
+        self.refresh_service_controls("power_monitor")
 
     def on_power_monitor_flag_changed(self, value):
-        desired = bool(value)
-        if desired == self.power_monitor_enabled:
-            return
-        if self.power_monitor_status == "systemctl not available":
-            blocker = QtCore.QSignalBlocker(self.power_monitor_flag)
-            try:
-                self.power_monitor_flag.setChecked(self.power_monitor_enabled)
-            finally:
-                del blocker
-            return
-        if desired:
-            ok, message = enable_power_monitor_service()
-        else:
-            ok, message = disable_power_monitor_service()
-        if ok:
-            self.set_status(message)
-        else:
-            self.set_status(message, level="error")
-            blocker = QtCore.QSignalBlocker(self.power_monitor_flag)
-            try:
-                self.power_monitor_flag.setChecked(self.power_monitor_enabled)
-            finally:
-                del blocker
-            return
-        self.refresh_power_monitor_controls()
+        self.on_service_flag_changed("power_monitor", value)
 
     def restore_profile_after_startup(self):
         if not self.profile_data:
@@ -3068,27 +3427,34 @@ class Main(QtWidgets.QWidget):
         self.apply_current_mode()
 
     def watch_profile_paths(self):
-        files = list(self.profile_watcher.files())
-        for path in files:
-            self.profile_watcher.removePath(path)
-        dirs = list(self.profile_watcher.directories())
-        for path in dirs:
-            self.profile_watcher.removePath(path)
-
         ensure_config_dir()
-        targets = []
+        targets = set()
         if os.path.isdir(CONFIG_DIR):
-            targets.append(CONFIG_DIR)
+            targets.add(CONFIG_DIR)
         if os.path.isfile(PROFILE_PATH):
-            targets.append(PROFILE_PATH)
-
-        for target in targets:
-            self.profile_watcher.addPath(target)
+            targets.add(PROFILE_PATH)
+        if os.path.isdir(AUTOSTART_DIR):
+            targets.add(AUTOSTART_DIR)
+        if os.path.isdir(SYSTEMD_USER_DIR):
+            targets.add(SYSTEMD_USER_DIR)
+
+        watcher = self.profile_watcher
+        current = set(watcher.files()) | set(watcher.directories())
+        if current == targets:
+            return
+        stale = current - targets
+        if stale:
+            watcher.removePaths(list(stale))
+        missing = targets - current
+        if missing:
+            watcher.addPaths(list(missing))
 
     def reload_profile_store_from_disk(self, announce=True):
+        self._profile_file_sig = profile_file_signature()
         self.profile_store = load_profile_store()
+        self.remember_loaded_profile_store()
         self.active_profile_name = self.profile_store["active"]
-        self.profile_data = dict(self.profile_store["profiles"][self.active_profile_name])
+        self.profile_data = self.profile_store["profiles"][self.active_profile_name]
         self.refresh_profile_combo()
         if announce:
             self.load_profile_into_controls(self.profile_data)
@@ -3096,10 +3462,9 @@ class Main(QtWidgets.QWidget):
     def on_profile_file_changed(self, path):
         if path != PROFILE_PATH:
             return
-        if self._ignore_profile_events:
-            self.watch_profile_paths()
-            return
         self.watch_profile_paths()
+        if profile_file_signature() == self._profile_file_sig:
+            return
         try:
             self.reload_profile_store_from_disk(announce=True)
             self.set_status(self.tr("status.profiles_reloaded"))
@@ -3110,13 +3475,21 @@ class Main(QtWidgets.QWidget):
             )
 
     def on_profile_directory_changed(self, path):
-        if path != CONFIG_DIR:
+        if path == SYSTEMD_USER_DIR:
+            self._unit_files = None
+            self.refresh_resume_controls()
+            self.refresh_power_monitor_controls()
             return
-        if self._ignore_profile_events:
-            self.watch_profile_paths()
+        if path == AUTOSTART_DIR:
+            self._autostart_cached = is_autostart_enabled()
+            self.refresh_autostart_flag()
+            return
+        if path != CONFIG_DIR:
             return
         self.watch_profile_paths()
-        if os.path.isfile(PROFILE_PATH):
+        # settings.json and the lock file live here too; only react to profile.json.
+        sig = profile_file_signature()
+        if sig is not None and sig != self._profile_file_sig:
             try:
                 self.reload_profile_store_from_disk(announce=True)
                 self.set_status(self.tr("status.profiles_updated"))
@@ -3131,16 +3504,22 @@ class Main(QtWidgets.QWidget):
         self.static_label.setVisible(is_static)
         self.static_color.setVisible(is_static)
         self.effect_panel.setVisible(not is_static)
-        self.direction.setEnabled(not self.reactive.isChecked())
-        if self.reactive.isChecked():
+        reactive = self.reactive.isChecked()
+        self.direction.setEnabled(not reactive)
+        if reactive:
             set_combo_by_data(self.direction, "none")
 
     def update_power_button(self):
         if not hasattr(self, "btn_power"):
             return
         label = self.tr("buttons.turn_on") if self.is_off else self.tr("buttons.turn_off")
-        self.btn_power.setText(label)
-        self.btn_power.setProperty("powerState", "off" if self.is_off else "on")
+        if self.btn_power.text() != label:
+            self.btn_power.setText(label)
+        state = "off" if self.is_off else "on"
+        if state == self._power_btn_state:
+            return
+        self._power_btn_state = state
+        self.btn_power.setProperty("powerState", state)
         self.btn_power.style().unpolish(self.btn_power)
         self.btn_power.style().polish(self.btn_power)
 
@@ -3172,15 +3551,15 @@ class Main(QtWidgets.QWidget):
         v = int(v)
         was_off = self.is_off
         self.last_brightness = v
-        self.refresh_profile_dirty_state()
+        self.refresh_brightness_dirty_state(v)
         if v <= 0:
-            self.brightness_timer.stop()
+            self.cancel_scheduled_apply()
             self.on_power_off()
             return
         self.is_off = False
-        if was_off:
-            self._pending_effect_after_brightness = True
-        self.brightness_timer.start()
+        self._local_seq += 1
+        self._dirty |= DIRTY_MODE if was_off else DIRTY_BRIGHTNESS
+        self.apply_timer.start()
 
     def on_power_on(self):
         self.is_off = False
@@ -3192,8 +3571,10 @@ class Main(QtWidgets.QWidget):
         self.update_power_button()
 
     def on_power_off(self):
-        rc, out, err = self.run_cli(["off"])
         self.is_off = True
+        self.start_off(self.on_power_off_done)
+
+    def on_power_off_done(self, rc, out, err):
         if rc == 0:
             self.set_status(self.tr("status.backlight_off"))
             self.update_power_button()
@@ -3210,23 +3591,34 @@ class Main(QtWidgets.QWidget):
         self.refresh_profile_dirty_state()
         if self.is_off:
             return
+        self._local_seq += 1
+        self._dirty |= DIRTY_MODE
         self.apply_timer.start()
 
+    def cancel_scheduled_apply(self):
+        self.apply_timer.stop()
+        self._dirty = 0
+
+    def on_apply_timeout(self):
+        dirty, self._dirty = self._dirty, 0
+        # Mode commands carry -b themselves, so they cover a pending brightness change.
+        if dirty & DIRTY_MODE:
+            self.apply_current_mode()
+        elif dirty & DIRTY_BRIGHTNESS:
+            self.apply_brightness_only()
+
     def apply_brightness_only(self):
         if self.is_off:
             return
         v = int(self.b_spin.value())
-        rc, out, err = self.run_cli(
-            ["brightness", str(v)],
-            log_cmd=False,
-            log_stdout=False,
-            log_stderr=False,
-        )
+        if v == self._last_applied_brightness:
+            return
+        self.queue_cli("brightness", ["brightness", _ISTR[v]], v)
+
+    def on_brightness_applied(self, rc, out, err, v):
         if rc == 0:
+            self._last_applied_brightness = v
             self.set_status(self.tr("status.brightness_set", value=v))
-            if self._pending_effect_after_brightness:
-                self._pending_effect_after_brightness = False
-                self.apply_current_mode()
         else:
             self.set_status(format_cli_error(rc, out, err))
 
@@ -3235,10 +3627,128 @@ class Main(QtWidgets.QWidget):
         time.sleep(0.06)
         return self.run_cli(args)
 
+    def queue_cli(self, kind, args, *context):
+        self._local_seq += 1
+        self._pending_cmd = (kind, args, context)
+        self.cli_timer.start()
+
+    def run_pending_cmd(self, *, blocking=False):
+        if self._cli_busy and not blocking:
+            # The CLI has no persistent mode, so instead of killing the running
+            # command the latest request waits and runs from end_cli_chain().
+            return
+        pending = self._pending_cmd
+        self._pending_cmd = None
+        if pending is None or self.is_off:
+            return
+        kind, args, context = pending
+        if kind != "brightness":
+            # Mode commands and resets set brightness themselves; re-send next time.
+            self._last_applied_brightness = None
+        if blocking:
+            if kind == "brightness":
+                rc, out, err = self.run_cli(args, **SILENT_CLI)
+                self.on_brightness_applied(rc, out, err, *context)
+            elif kind == "static":
+                rc, out, err = self.hard_reset_then(args)
+                self.on_static_applied(rc, out, err, *context)
+            else:
+                rc, out, err, _used, used_str = apply_effect_with_fallback(
+                    args, runner=lambda a: self.run_cli(a)
+                )
+                self.on_effect_applied(rc, out, err, used_str)
+            return
+        self._cli_seq += 1
+        seq = self._cli_seq
+        self._cli_busy = True
+        if kind == "brightness":
+            def done(rc, out, err):
+                self.on_brightness_applied(rc, out, err, *context)
+                self.end_cli_chain()
+
+            self.start_cli(args, done, **SILENT_CLI)
+        elif kind == "static":
+            def off_done(*_):
+                self._static_step = (seq, args, context)
+                QtCore.QTimer.singleShot(60, self._start_static_step)
+
+            self.start_cli(["off"], off_done)
+        else:
+            self._start_effect_step(drop_known_rejected(args), set())
+
+    def _start_static_step(self):
+        step, self._static_step = self._static_step, None
+        if step is None:
+            return
+        seq, args, context = step
+        if seq != self._cli_seq:
+            return
+        def done(rc, out, err):
+            self.on_static_applied(rc, out, err, *context)
+            self.end_cli_chain()
+
+        self.start_cli(args, done)
+
+    def _start_effect_step(self, current, tried):
+        def done(rc, out, err):
+            if rc != 0:
+                msg = (err or out or "").lower()
+                if tried or "attr is not needed by effect" in msg:
+                    candidate = fallback_args(current, out, err, tried)
+                    if candidate is not None:
+                        self._start_effect_step(candidate, tried)
+                        return
+            self.on_effect_applied(rc, out, err, effect_args_detail(current, rc))
+            self.end_cli_chain()
+
+        self.start_cli(current, done)
+
+    def start_off(self, callback=None, **log_flags):
+        # Power off supersedes whatever is queued or running.
+        self.cancel_cli()
+        self._cli_busy = True
+        self._last_applied_brightness = None
+
+        def done(rc, out, err):
+            if callback is not None:
+                callback(rc, out, err)
+            self.end_cli_chain()
+
+        self.start_cli(["off"], done, **log_flags)
+
+    def end_cli_chain(self):
+        self._cli_busy = False
+        if self._flushing:
+            return
+        if self._pending_cmd is not None and not self.cli_timer.isActive():
+            self.run_pending_cmd()
+
+    def flush_pending_cmd(self):
+        # Finish the running chain step by step, including a static apply
+        # parked between its "off" and the colour, then run what is queued.
+        self._flushing = True
+        try:
+            self.cli_timer.stop()
+            proc = self._cli_proc
+            while True:
+                if proc.state() != QtCore.QProcess.NotRunning:
+                    if not proc.waitForFinished(3000):
+                        break
+                    continue
+                if self._static_step is None:
+                    break
+                time.sleep(0.06)
+                self._start_static_step()
+            self._cli_busy = False
+            self.run_pending_cmd(blocking=True)
+            self.wait_for_cli()
+        finally:
+            self._flushing = False
+
     def apply_static(self):
-        v = int(self.b_spin.value())
-        color_value = self.static_color.currentData() or self.static_color.currentText()
+        v = self._b
         display_color = self.static_color.currentText()
+        color_value = self.static_color.currentData() or display_color
         self.last_static_color = color_value
 
         if color_value == "custom":
@@ -3249,13 +3759,9 @@ class Main(QtWidgets.QWidget):
                 hex_color = hex_color[1:]
             if len(hex_color) == 6:
                 try:
-                    r = int(hex_color[0:2], 16)
-                    g = int(hex_color[2:4], 16)
-                    b = int(hex_color[4:6], 16)
-                    rc, out, err = self.hard_reset_then(
-                        ["monocolor", "-b", str(v), "--rgb", f"{r},{g},{b}"]
-                    )
-                    display_color = f"#{hex_color.upper()}"
+                    r, g, b = bytes.fromhex(hex_color)
+                    args = ["monocolor", "-b", _ISTR[v], "--rgb", f"{r},{g},{b}"]
+                    display_color = "#%02X%02X%02X" % (r, g, b)
                 except ValueError:
                     self.set_status("Invalid hex color format", level="error")
                     return
@@ -3263,10 +3769,11 @@ class Main(QtWidgets.QWidget):
                 self.set_status("Hex color must be 6 characters", level="error")
                 return
         else:
-            rc, out, err = self.hard_reset_then(
-                ["monocolor", "-b", str(v), "--name", color_value]
-            )
+            args = ["monocolor", "-b", _ISTR[v], "--name", color_value]
+
+        self.queue_cli("static", args, v, display_color)
 
+    def on_static_applied(self, rc, out, err, v, display_color):
         if rc == 0:
             self.set_status(
                 self.tr(
@@ -3280,40 +3787,29 @@ class Main(QtWidgets.QWidget):
                 self.tr(
                     "status.error_generic",
                     code=rc,
-                    message=(err or out or self.tr("status.unknown_error")),
+                    message=(err or out or self._unknown_error),
                 ),
                 level="error",
             )
 
     def build_effect_args(self):
-        v = int(self.b_spin.value())
-        eff = self.mode.currentData() or "static"
-        args = ["effect", "-b", str(v)]
-
-        if self.speed.value() != 5:
-            args += ["-s", str(self.speed.value())]
-
-        col = self.color.currentData() or "none"
-        if col != "none":
-            args += ["-c", col]
-
-        if self.reactive.isChecked():
-            args.append("-r")
-        else:
-            d = self.direction.currentData() or "none"
-            if d != "none":
-                args += ["-d", d]
-
-        args.append(eff)
-        return args
+        speed = self._speed
+        col = self._color
+        d = self._direction
+        return [
+            "effect",
+            "-b", _ISTR[self._b],
+            *(("-s", _ISTR[speed]) if speed != 5 else ()),
+            *(("-c", col) if col != "none" else ()),
+            *(("-r",) if self._reactive else (("-d", d) if d != "none" else ())),
+            self._mode,
+        ]
 
     def apply_effect(self):
-        args = self.build_effect_args()
-        rc, out, err, used = apply_effect_with_fallback(
-            args, runner=lambda a: self.run_cli(a)
-        )
+        self.queue_cli("effect", self.build_effect_args())
+
+    def on_effect_applied(self, rc, out, err, used_str):
         if rc == 0:
-            used_str = " ".join(used[1:])
             self.set_status(
                 self.tr("status.effect_applied", details=used_str)
             )
@@ -3322,18 +3818,14 @@ class Main(QtWidgets.QWidget):
                 self.tr(
                     "status.error_generic",
                     code=rc,
-                    message=(err or out or self.tr("status.unknown_error")),
+                    message=(err or out or self._unknown_error),
                 ),
                 level="error",
             )
 
     def apply_current_mode(self):
-        if self.is_off:
-            return
-        if self.mode.currentData() == "static":
-            self.apply_static()
-        else:
-            self.apply_effect()
+        if not self.is_off:
+            self._apply_fn()
 
 
 def main():
@@ -3342,11 +3834,10 @@ def main():
     lock_handle = acquire_single_instance_lock()
     if lock_handle is None:
         language = detect_system_language()
-        translations = load_translations(language)
-        fallback = load_translations("en")
+        translations = load_translations(language) or load_translations("en")
 
         def tr(key, **kwargs):
-            text = translations.get(key) or fallback.get(key) or key
+            text = translations.get(key) or key
             if kwargs:
                 try:
                     return text.format(**kwargs)
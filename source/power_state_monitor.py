@@ -5,23 +5,50 @@ from __future__ import annotations
 
 import json
 import os
-import shlex
-import shutil
-import subprocess
+import select
+import socket
 import sys
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+# Shipped alongside this script; restores run in-process instead of spawning
+# a second interpreter per power change.
+from restore_profile import (
+    TOOL_ENV_VAR,
+    apply_profile,
+    dump_json_bytes,
+    load_json_file,
+    resolve_tool,
+    select_profile,
+)
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-RESTORE_SCRIPT = os.path.join(BASE_DIR, "restore_profile.py")
-PYTHON_EXECUTABLE = sys.executable or shutil.which("python3") or "/usr/bin/python3"
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "backlight-linux")
 SETTINGS_PATH = os.path.join(CONFIG_DIR, "settings.json")
 PROFILE_PATH = os.path.join(CONFIG_DIR, "profile.json")
 POWER_SUPPLY_DIR = "/sys/class/power_supply"
 MAINS_TYPES = {"mains", "ac", "usb"}
+ONLINE_BYTE = ord("1")
 POLL_INTERVAL_SECONDS = 3
-REDISCOVER_INTERVAL = 20  # iterations
+REDISCOVER_INTERVAL = 20  # iterations, polling fallback only
+UEVENT_FALLBACK_SECONDS = 60
+# A new power state must hold this long, with no further power_supply events,
+# before the profile is reapplied; a loose connector can flap several times a second.
+DEBOUNCE_SECONDS = 1.0
+UEVENT_BUFFER_SIZE = 8192
+UEVENT_POWER_SUPPLY = b"SUBSYSTEM=power_supply"
+# Not exported by the socket module; value from <linux/netlink.h>.
+NETLINK_KOBJECT_UEVENT = 15
+
+# Open fds for the mains `online` attributes, reread in place with pread.
+_online_fds: Dict[str, int] = {}
+# Supply directories known not to be mains (batteries and the like).
+_other_supplies: Set[str] = set()
+# Reused read buffer for those attributes, so a check allocates nothing.
+_online_buf = bytearray(8)
+# Parsed JSON per path, keyed on (mtime_ns, size) so an unchanged file costs one stat.
+_json_cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+# CLI path, resolved once at startup and again only while it is missing.
+_tool: Optional[str] = None
 
 
 def log(msg: str) -> None:
@@ -29,65 +56,132 @@ def log(msg: str) -> None:
     print(f"[{timestamp}] {msg}", flush=True)
 
 
+def _read_small(path: str) -> str:
+    # sysfs attributes are a few bytes; skip the buffered text-file machinery.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 32).decode("ascii", "ignore").strip().lower()
+    finally:
+        os.close(fd)
+
+
 def discover_mains_online_paths() -> List[str]:
-    if not os.path.isdir(POWER_SUPPLY_DIR):
+    try:
+        entries = os.scandir(POWER_SUPPLY_DIR)
+    except OSError:
+        for stale in list(_online_fds):
+            close_online_fd(stale)
+        _other_supplies.clear()
         return []
     paths: List[str] = []
-    for entry in os.listdir(POWER_SUPPLY_DIR):
-        entry_path = os.path.join(POWER_SUPPLY_DIR, entry)
-        type_path = os.path.join(entry_path, "type")
-        online_path = os.path.join(entry_path, "online")
+    seen = set()
+    with entries:
+        for entry in entries:
+            seen.add(entry.path)
+            online_path = f"{entry.path}/online"
+            # A supply keeps its type while it exists: mains ones already hold
+            # an fd, others are remembered, so only new entries are read.
+            if online_path in _online_fds:
+                paths.append(online_path)
+                continue
+            if entry.path in _other_supplies:
+                continue
+            try:
+                power_type = _read_small(f"{entry.path}/type")
+            except OSError:
+                continue
+            if power_type not in MAINS_TYPES:
+                _other_supplies.add(entry.path)
+                continue
+            # Opening the fd read_online_value will use doubles as the
+            # existence check.
+            try:
+                _online_fds[online_path] = os.open(online_path, os.O_RDONLY)
+            except OSError:
+                continue
+            paths.append(online_path)
+    paths.sort()
+    for stale in set(_online_fds) - set(paths):
+        close_online_fd(stale)
+    _other_supplies.intersection_update(seen)
+    return paths
+
+
+def close_online_fd(path: str) -> None:
+    fd = _online_fds.pop(path, None)
+    if fd is not None:
         try:
-            with open(type_path, "r", encoding="utf-8") as handle:
-                power_type = handle.read().strip().lower()
+            os.close(fd)
         except OSError:
-            continue
-        if power_type not in MAINS_TYPES:
-            continue
-        if os.path.isfile(online_path):
-            paths.append(online_path)
-    return sorted(set(paths))
+            pass
 
 
 def read_online_value(path: str) -> Optional[bool]:
+    # sysfs regenerates an attribute on every read from offset 0, so one open
+    # fd per supply is enough; no reopen or seek per check.
+    fd = _online_fds.get(path)
     try:
-        with open(path, "r", encoding="utf-8") as handle:
-            return handle.read().strip() == "1"
+        if fd is None:
+            fd = _online_fds[path] = os.open(path, os.O_RDONLY)
+        n = os.preadv(fd, [_online_buf], 0)
     except OSError:
+        close_online_fd(path)
         return None
+    # The attribute is "0\n" or "1\n"; look at the first byte in place.
+    return n > 0 and _online_buf[0] == ONLINE_BYTE
 
 
-def ensure_restore_script_executable() -> None:
+def read_json_dict(path: str) -> dict:
+    """Read a JSON object, reusing the last parse while the file is unchanged.
+
+    The returned dict is shared with the cache; callers must not modify it.
+    """
     try:
-        st = os.stat(RESTORE_SCRIPT)
+        st = os.stat(path)
     except FileNotFoundError:
-        return
-    new_mode = st.st_mode | 0o111
-    if new_mode != st.st_mode:
-        try:
-            os.chmod(RESTORE_SCRIPT, new_mode)
-        except OSError:
-            pass
+        _json_cache.pop(path, None)
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        data = load_json_file(path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    data = data if isinstance(data, dict) else {}
+    _json_cache[path] = (key, data)
+    return data
 
 
 def read_settings() -> dict:
     """Read settings.json to get AC/battery profile preferences."""
-    try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    return read_json_dict(SETTINGS_PATH)
 
 
 def read_profile_store() -> dict:
     """Read profile.json to get available profiles."""
+    return read_json_dict(PROFILE_PATH)
+
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    tmp_path = path + ".tmp"
     try:
-        with open(PROFILE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def switch_active_profile(profile_name: str) -> bool:
@@ -98,24 +192,23 @@ def switch_active_profile(profile_name: str) -> bool:
     if profile_name not in store.get("profiles", {}):
         log(f"Profile '{profile_name}' not found.")
         return False
-    store["active"] = profile_name
-    try:
-        tmp_path = PROFILE_PATH + ".tmp"
-        with open(tmp_path, "w", encoding="utf-8") as handle:
-            json.dump(store, handle, indent=2)
-        os.replace(tmp_path, PROFILE_PATH)
+    if store.get("active") == profile_name:
+        # Already active; rewriting would only wake the GUI's file watcher.
         return True
+    store = dict(store, active=profile_name)
+    try:
+        write_file_atomic(PROFILE_PATH, dump_json_bytes(store))
+        st = os.stat(PROFILE_PATH)
     except OSError as exc:
         log(f"Failed to save profile: {exc}")
         return False
+    # We just wrote it; seed the cache so the restore below does not reparse.
+    _json_cache[PROFILE_PATH] = ((st.st_mtime_ns, st.st_size), store)
+    return True
 
 
 def restore_profile(reason: str, power_state: Optional[bool] = None) -> None:
-    ensure_restore_script_executable()
-    if not os.path.isfile(RESTORE_SCRIPT):
-        log(f"restore_profile.py not found ({RESTORE_SCRIPT}).")
-        return
-
+    global _tool
     # Check if we should switch to a power-specific profile
     if power_state is not None:
         settings = read_settings()
@@ -132,39 +225,137 @@ def restore_profile(reason: str, power_state: Optional[bool] = None) -> None:
             else:
                 log(f"Cannot switch profile to '{target_profile}', keeping current profile")
 
-    cmd = [PYTHON_EXECUTABLE, RESTORE_SCRIPT]
-    log(f"{reason}: running {' '.join(shlex.quote(part) for part in cmd)}")
-    proc = subprocess.run(cmd, text=True, capture_output=True)
-    if proc.stdout:
-        print(proc.stdout.strip(), flush=True)
-    if proc.stderr:
-        print(proc.stderr.strip(), file=sys.stderr, flush=True)
-    if proc.returncode != 0:
-        log(f"restore_profile.py exited with code {proc.returncode}")
+    store = read_profile_store()
+    if not store:
+        log(f"{reason}: no profile found at {PROFILE_PATH}, nothing to restore.")
+        return
+    if _tool is None:
+        _tool = resolve_tool()
+        if _tool is None:
+            log(f"{reason}: CLI tool not found. Install 'ite8291r3-ctl' or set ${TOOL_ENV_VAR}.")
+            return
+    log(f"{reason}: restoring profile")
+    try:
+        rc = apply_profile(select_profile(store), _tool)
+    except Exception as exc:  # keep monitoring whatever the restore does
+        log(f"Restore failed: {exc!r}")
+        return
+    finally:
+        # restore_profile prints without flushing; keep the journal in order.
+        sys.stdout.flush()
+        sys.stderr.flush()
+    if rc != 0:
+        log(f"Restore exited with code {rc}")
+
+
+def sd_notify(state: str) -> None:
+    """Send a state string to systemd when running as a Type=notify unit."""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode())
+    except OSError:
+        pass
 
 
-def compute_power_state(paths: List[str]) -> Optional[bool]:
-    if not paths:
+def open_uevent_socket() -> Optional[socket.socket]:
+    """Subscribe to kernel uevents; None means fall back to polling."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+    except (AttributeError, OSError) as exc:
+        log(f"Kernel uevents unavailable ({exc}); polling every {POLL_INTERVAL_SECONDS}s.")
+        return None
+    try:
+        # Port id 0 lets the kernel pick one; group 1 carries kernel uevents.
+        sock.bind((0, 1))
+    except OSError as exc:
+        sock.close()
+        log(f"Kernel uevents unavailable ({exc}); polling every {POLL_INTERVAL_SECONDS}s.")
         return None
-    any_online = False
-    any_offline = False
+    return sock
+
+
+def wait_for_power_event(sock: socket.socket, timeout: float) -> Tuple[bool, bool]:
+    """Block until a power_supply uevent or the fail-safe timeout.
+
+    Returns (recheck, rediscover).
+    """
+    readable, _, _ = select.select([sock], [], [], timeout)
+    if not readable:
+        return True, True
+    recheck = False
+    rediscover = False
+    while True:
+        try:
+            payload = sock.recv(UEVENT_BUFFER_SIZE, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            break
+        except OSError:
+            # ENOBUFS: events were dropped, so assume one of them was ours.
+            return True, True
+        fields = payload.split(b"\0")
+        if UEVENT_POWER_SUPPLY not in fields:
+            continue
+        recheck = True
+        if fields[0].startswith((b"add@", b"remove@")):
+            rediscover = True
+    return recheck, rediscover
+
+
+def compute_power_state(paths: List[str]) -> Optional[bool]:
+    # Any supply online means AC; otherwise battery if at least one was readable.
+    state = None
     for path in paths:
         value = read_online_value(path)
-        if value is True:
-            any_online = True
-            break
+        if value:
+            return True
         if value is False:
-            any_offline = True
-    if any_online:
-        return True
-    if any_offline:
-        return False
-    return None
+            state = False
+    return state
+
+
+def settle_power_state(
+    sock: Optional[socket.socket], paths: List[str], state: Optional[bool]
+) -> Tuple[Optional[bool], List[str]]:
+    """Wait until the power state stops changing; returns (state, paths)."""
+    deadline = time.monotonic() + DEBOUNCE_SECONDS
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            if sock is None:
+                time.sleep(remaining)
+            elif select.select([sock], [], [], remaining)[0]:
+                recheck, rediscover = wait_for_power_event(sock, 0)
+                if rediscover:
+                    paths = discover_mains_online_paths()
+                # Battery level and charging updates are power_supply events
+                # too; only a different reading restarts the wait.
+                if recheck:
+                    current = compute_power_state(paths)
+                    if current != state:
+                        state = current
+                        deadline = time.monotonic() + DEBOUNCE_SECONDS
+                continue
+        current = compute_power_state(paths)
+        if current == state:
+            return state, paths
+        state = current
+        deadline = time.monotonic() + DEBOUNCE_SECONDS
 
 
 def monitor_loop() -> int:
     iteration = 0
+    sock = open_uevent_socket()
     paths = discover_mains_online_paths()
+    # Subscribed and supplies found; events from here on are not missed.
+    # Signal readiness before the initial restore, which can take seconds
+    # and would otherwise hold up `systemctl --user enable --now`.
+    sd_notify("READY=1")
     last_state = compute_power_state(paths)
     if last_state is None:
         log("Unable to determine initial power state.")
@@ -173,27 +364,37 @@ def monitor_loop() -> int:
         restore_profile("Initial power state", power_state=last_state)
 
     while True:
-        iteration += 1
-        if iteration % REDISCOVER_INTERVAL == 0:
-            paths = discover_mains_online_paths()
+        if sock is None:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            iteration += 1
+            if iteration % REDISCOVER_INTERVAL == 0:
+                paths = discover_mains_online_paths()
+        else:
+            recheck, rediscover = wait_for_power_event(sock, UEVENT_FALLBACK_SECONDS)
+            if rediscover:
+                paths = discover_mains_online_paths()
+            if not recheck:
+                continue
 
         state = compute_power_state(paths)
         if state is None:
-            time.sleep(POLL_INTERVAL_SECONDS)
             continue
 
         if last_state is None:
             last_state = state
         elif state != last_state:
+            state, paths = settle_power_state(sock, paths, state)
+            if state is None or state == last_state:
+                continue
             label = "AC" if state else "battery"
             log(f"Power source changed: now on {label}.")
             restore_profile("Power source change", power_state=state)
             last_state = state
 
-        time.sleep(POLL_INTERVAL_SECONDS)
-
 
 def main() -> int:
+    global _tool
+    _tool = resolve_tool()
     try:
         monitor_loop()
     except KeyboardInterrupt:
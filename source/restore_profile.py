@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Restore keyboard backlight profile saved by the GUI."""
 
+import functools
 import json
 import os
 import shlex
@@ -10,6 +11,11 @@ import sys
 import time
 from typing import List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 TOOL_ENV_VAR = "ITE8291R3_CTL"
 TOOL_CANDIDATES = [
     os.environ.get(TOOL_ENV_VAR),
@@ -39,16 +45,28 @@ def resolve_tool():
             if not resolved:
                 continue
             path = resolved
-        if os.path.exists(path) and os.access(path, os.X_OK):
+        if os.access(path, os.X_OK):
             return path
     return None
 
 
+def load_json_file(path):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either.
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def dump_json_bytes(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
 def read_profile():
     try:
-        with open(PROFILE_PATH, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            return data if isinstance(data, dict) else {}
+        data = load_json_file(PROFILE_PATH)
+        return data if isinstance(data, dict) else {}
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
@@ -58,17 +76,34 @@ def sanitize_choice(value, options, fallback):
 
 
 def build_commands(profile):
+    # The power monitor restores the same few profiles over and over; memoize
+    # on the profile's items. The returned lists are shared: do not modify.
+    try:
+        return _build_commands_cached(tuple(sorted(profile.items())))
+    except TypeError:
+        # Unhashable values (hand-edited JSON); nothing to key the cache on.
+        return _build_commands(profile)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_commands_cached(items):
+    return _build_commands(dict(items))
+
+
+def _build_commands(profile):
     brightness = clamp(profile.get("brightness"), 0, 50, 40)
     if brightness <= 0:
         return [["off"]]
 
+    # ite8291r3-ctl takes one command per run and has no batch or stdin mode,
+    # so the count of commands is the count of process spawns. monocolor and
+    # effect set the brightness through -b; no separate brightness step.
     commands = [["off"]]
 
     mode = profile.get("mode", "static")
     if mode == "static":
         color = profile.get("static_color") or "white"
         commands.append(["monocolor", "-b", str(brightness), "--name", color])
-        commands.append(["brightness", str(brightness)])
         return commands
 
     # Effects
@@ -91,7 +126,6 @@ def build_commands(profile):
 
     args.append(mode)
     commands.append(args)
-    commands.append(["brightness", str(brightness)])
     return commands
 
 
@@ -169,6 +203,9 @@ def apply_profile_with_verification(tool, commands, desired_brightness):
 
 
 def run_commands_with_retry(tool, commands):
+    # Strictly one CLI process at a time: each run claims the controller's USB
+    # handle, so an overlapping run fails with "device handle could not be
+    # acquired", and every step must land after the "off" reset anyway.
     deadline = time.monotonic() + 12.0
     delay = 0.6
     last_rc = 0
@@ -194,23 +231,34 @@ def run_commands_with_retry(tool, commands):
     return last_rc
 
 
-def main():
-    store = read_profile()
-    if not store:
-        print(f"No profile found at {PROFILE_PATH}. Nothing to restore.")
-        return 0
-
+def select_profile(store):
     # Extract the active profile data from the store
     active_name = store.get("active", "Default")
     profiles = store.get("profiles", {})
     if active_name in profiles:
-        profile = profiles[active_name]
-    elif profiles:
+        return profiles[active_name]
+    if profiles:
         # Fallback to first available profile
-        profile = next(iter(profiles.values()))
-    else:
-        # Legacy format: profile data at root level
-        profile = store
+        return next(iter(profiles.values()))
+    # Legacy format: profile data at root level
+    return store
+
+
+def apply_profile(profile, tool):
+    commands = build_commands(profile)
+    desired_brightness = clamp(profile.get("brightness"), 0, 50, 40)
+    rc = apply_profile_with_verification(tool, commands, desired_brightness)
+    if rc != 0:
+        printable = " / ".join(" ".join(cmd) for cmd in commands)
+        print(f"Command(s) {printable} failed with exit code {rc}", file=sys.stderr)
+    return rc
+
+
+def main():
+    store = read_profile()
+    if not store:
+        print(f"No profile found at {PROFILE_PATH}. Nothing to restore.")
+        return 0
 
     tool = resolve_tool()
     if not tool:
@@ -221,13 +269,7 @@ def main():
         )
         return 1
 
-    commands = build_commands(profile)
-    desired_brightness = clamp(profile.get("brightness"), 0, 50, 40)
-    rc = apply_profile_with_verification(tool, commands, desired_brightness)
-    if rc != 0:
-        printable = " / ".join(" ".join(cmd) for cmd in commands)
-        print(f"Command(s) {printable} failed with exit code {rc}", file=sys.stderr)
-    return rc
+    return apply_profile(select_profile(store), tool)
 
 
 if __name__ == "__main__":